@@ -0,0 +1,55 @@
+"""
+Métricas do Google Scholar: os valores oficiais do perfil prevalecem,
+mesmo quando a janela recente do perfil ('since_AAAA') não é a padrão.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import update_fallback as uf  # noqa: E402
+
+
+def _fake_profile(since_key):
+    articles = [
+        {"title": f"Artigo {i}", "year": str(2010 + i), "cited_by": {"value": c}}
+        for i, c in enumerate([40, 25, 12, 11, 3, 0])
+    ]
+    return {
+        "cited_by": {
+            "table": [
+                {"citations": {"all": 91, since_key: 30}},
+                {"h_index": {"all": 5, since_key: 3}},
+                {"i10_index": {"all": 4, since_key: 2}},
+            ],
+            "graph": [{"year": 2024, "citations": 10}, {"year": 2025, "citations": 20}],
+        },
+        "articles": articles,
+    }
+
+
+def test_since_2022_profile_keeps_official_h_and_i10(monkeypatch):
+    monkeypatch.setattr(uf, "METRIC_WINDOWS", ["all", "since_2021"])
+    monkeypatch.setattr(uf, "_scholar_request", lambda params, pool: _fake_profile("since_2022"))
+
+    data = uf.fetch_scholar_data("autor", "CHAVE", previous_data=None)
+    table = {name: values for row in data["profile"]["cited_by"]["table"] for name, values in row.items()}
+
+    # A primeira janela 'since_*' (a que o frontend exibe) é a do perfil
+    first_since = next(w for w in table["h_index"] if w.startswith("since_"))
+    assert first_since == "since_2022"
+    assert table["citations"]["since_2022"] == 30
+    assert table["h_index"]["all"] == 5
+    assert table["h_index"]["since_2022"] == 3
+    assert table["i10_index"]["all"] == 4
+    assert table["i10_index"]["since_2022"] == 2
+
+
+def test_pt_br_profile_window_is_normalized(monkeypatch):
+    monkeypatch.setattr(uf, "_scholar_request", lambda params, pool: _fake_profile("desde_2022"))
+
+    data = uf.fetch_scholar_data("autor", "CHAVE", previous_data=None)
+    table = {name: values for row in data["profile"]["cited_by"]["table"] for name, values in row.items()}
+
+    assert table["h_index"]["since_2022"] == 3
+    assert table["i10_index"]["since_2022"] == 2
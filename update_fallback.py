@@ -8,33 +8,91 @@
 # - Scopus (Elsevier API)
 # - Web of Science (fallback CSV)
 #
-# O script combina os dados e gera um arquivo JSON puro para o frontend.
+# O script combina os dados, unifica as publicações das diferentes fontes
+# (academicData.publications) e gera um arquivo JSON puro para o frontend.
 # As chaves e configurações são carregadas de um arquivo 'keys.json' unificado.
 # Implementa fallback automático e trata falhas de conexão.
 #
 # Autor: Weverton Gomes Costa
-# Versão: 13.0.0 (Final - Sem Merge)
+# Versão: 14.0.0 (Merge entre fontes)
 
-import requests
+import argparse
+import base64
+import contextvars
+import importlib
+import importlib.util
 import json
 import re
 import csv
+import glob
+import gzip
+import hashlib
+import sqlite3
 import math
+import zlib
 from datetime import datetime
 import sys
 import os
 import logging
+import signal
 import shutil       # <--- Adicionar
 import unicodedata  # <--- Adicionar
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from urllib.parse import urlsplit, urlunsplit, parse_qs, parse_qsl
+
+
+def _lazy_import(name: str):
+    """
+    Registra o módulo em sys.modules sem executá-lo: o import de verdade só
+    acontece no primeiro acesso a um atributo (importlib.util.LazyLoader).
+    Assim, importar este script (bibliotecas, notebooks, testes) não paga
+    o custo de 'requests'/'numpy' até um coletor ou cálculo precisar deles.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"Módulo '{name}' não encontrado.")
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+requests = _lazy_import("requests")
+np = _lazy_import("numpy")
+
+
+def _load_heavy_modules():
+    """
+    Força o carregamento dos módulos adiados antes de abrir threads (o
+    LazyLoader não é seguro para o primeiro acesso concorrente).
+    """
+    requests.adapters.HTTPAdapter
+    np.ndarray
+
+
+def _optional_import(name: str):
+    """Importa um pacote opcional; devolve None se não estiver instalado."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
 
 # ==============================================================================
 # CONFIGURAÇÃO DO LOGGING
 # ==============================================================================
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
+def setup_logging(level=logging.INFO):
+    """Configura o logging do script (chamado pela CLI, não no import)."""
+    logging.basicConfig(
+        level=level,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
 
 # ==============================================================================
 # CARREGAMENTO DE CONFIGURAÇÕES
@@ -42,7 +100,8 @@ logging.basicConfig(
 def load_keys(keys_file: str = "keys.json") -> dict:
     """
     Carrega as configurações e chaves de um arquivo JSON.
-    Interrompe o script em caso de erro crítico.
+    Em caso de erro crítico, registra no log e propaga a exceção
+    (FileNotFoundError / json.JSONDecodeError); a CLI encerra com código 1.
     """
     try:
         logging.info(f"Carregando configurações do arquivo '{keys_file}'...")
@@ -53,93 +112,196 @@ def load_keys(keys_file: str = "keys.json") -> dict:
         logging.critical(
             f"ERRO CRÍTICO: O arquivo de chaves '{keys_file}' não foi encontrado."
         )
-        sys.exit(1)
+        raise
 
     except json.JSONDecodeError:
         logging.critical(
             f"ERRO CRÍTICO: O arquivo '{keys_file}' contém um JSON inválido."
         )
-        sys.exit(1)
+        raise
 
 
 # ==============================================================================
 # CARREGAMENTO DAS CHAVES
 # ==============================================================================
-keys = load_keys()
+# Nada é lido no import: os valores abaixo são os padrões, e configure()
+# (chamado pela CLI ou por quem usa o módulo como biblioteca) aplica o
+# keys.json por cima deles.
+keys = {}
 
 # ------------------------------------------------------------------------------
 # 1. Identidade do autor e fontes principais (CRÍTICAS)
 # ------------------------------------------------------------------------------
-GITHUB_USERNAME = keys.get("github_username")
-SCHOLAR_AUTHOR_ID = keys.get("scholar_author_id")
-ORCID_ID = keys.get("orcid_id")
+GITHUB_USERNAME = None
+SCHOLAR_AUTHOR_ID = None
+ORCID_ID = None
 
 # ------------------------------------------------------------------------------
 # 2. Credenciais e tokens (NÃO CRÍTICOS, exceto SerpApi)
 # ------------------------------------------------------------------------------
-GITHUB_TOKEN = keys.get("github_token")  # Opcional
+GITHUB_TOKEN = None  # Opcional
 
-# SerpApi: permite múltiplas chaves com rotação
-SERPAPI_KEYS_RAW = [
-    keys.get("serpapi_api_key"),
-    keys.get("serpapi_api_key2"),
-]
+# SerpApi: aceita qualquer quantidade de entradas 'serpapi_api_key*'
+# (serpapi_api_key, serpapi_api_key2, ..., serpapi_api_key10), em ordem.
+def _serpapi_key_order(name: str) -> int:
+    suffix = name[len("serpapi_api_key"):].lstrip("_")
+    return int(suffix) if suffix.isdigit() else (1 if not suffix else 10**6)
 
-SERPAPI_KEYS = [
-    key for key in SERPAPI_KEYS_RAW
-    if key and "CHAVE" not in key.upper()
-]
+
+SERPAPI_KEYS_RAW = []
+SERPAPI_KEYS = []
+
+# Busca incremental no Scholar (só pagina até achar artigos já conhecidos)
+SCHOLAR_INCREMENTAL = True
+
+# ORCID: busca também os registros completos dos works (em lote)
+ORCID_DETAILED = False
 
 # ------------------------------------------------------------------------------
 # 3. Métricas acadêmicas adicionais (opcionais / fallback)
 # ------------------------------------------------------------------------------
-SCOPUS_API_KEY = keys.get("scopus_api_key")
-SCOPUS_AUTHOR_ID = keys.get("scopus_author_id")
+SCOPUS_API_KEY = None
+SCOPUS_AUTHOR_ID = None
 
-WOS_API_KEY = keys.get("wos_api_key")
-WOS_RESEARCHER_ID = keys.get("wos_researcher_id")
+WOS_API_KEY = None
+WOS_RESEARCHER_ID = None
 
 # ------------------------------------------------------------------------------
 # 4. Arquivos de saída
 # ------------------------------------------------------------------------------
 MAIN_FILENAME = "fallback-data.json"
+DELTA_FILENAME = "fallback-data.delta.json"
 TEMP_FILENAME = "fallback-data-temp.json"
 
-# ==============================================================================
-# VALIDAÇÃO DAS CONFIGURAÇÕES
-# ==============================================================================
 
-# ---- Validações CRÍTICAS (site não funciona sem isso) -------------------------
-if not GITHUB_USERNAME:
-    logging.critical("ERRO CRÍTICO: 'github_username' não configurado em keys.json.")
-    sys.exit(1)
+# Caches locais entre execuções (não versionados)
+def _set_cache_dir(cache_dir: str):
+    global CACHE_DIR, GITHUB_CACHE_FILE, SCOPUS_CITATIONS_CACHE_FILE
+    global ORCID_SNAPSHOT_FILE, WOS_CACHE_FILE, REGISTRY_DB_FILE, SNAPSHOT_DIR, HTTP_CACHE_DIR
+    CACHE_DIR = cache_dir
+    GITHUB_CACHE_FILE = os.path.join(CACHE_DIR, "github_repos.json")
+    SCOPUS_CITATIONS_CACHE_FILE = os.path.join(CACHE_DIR, "scopus_citations.json")
+    ORCID_SNAPSHOT_FILE = os.path.join(CACHE_DIR, "orcid_snapshot.json")
+    WOS_CACHE_FILE = os.path.join(CACHE_DIR, "wos_parse_cache.json")
+    REGISTRY_DB_FILE = os.path.join(CACHE_DIR, "registry.sqlite3")
+    SNAPSHOT_DIR = os.path.join(CACHE_DIR, "snapshots")
+    HTTP_CACHE_DIR = os.path.join(CACHE_DIR, "http")
 
-if not SCHOLAR_AUTHOR_ID:
-    logging.critical("ERRO CRÍTICO: 'scholar_author_id' não configurado em keys.json.")
-    sys.exit(1)
 
-if not ORCID_ID:
-    logging.critical("ERRO CRÍTICO: 'orcid_id' não configurado em keys.json.")
-    sys.exit(1)
+_set_cache_dir(".cache")
 
-if not SERPAPI_KEYS:
-    logging.critical(
-        "ERRO CRÍTICO: Nenhuma chave válida da SerpApi encontrada em keys.json."
-    )
-    sys.exit(1)
+# ------------------------------------------------------------------------------
+# 5. Opções do keys.json que sobrescrevem constantes definidas nas seções
+#    de cada módulo (o padrão fica junto da constante)
+# ------------------------------------------------------------------------------
+CONFIG_OVERRIDES = {
+    "scholar_incremental": "SCHOLAR_INCREMENTAL",
+    "orcid_detailed": "ORCID_DETAILED",
+    "metric_windows": "METRIC_WINDOWS",
+    "http_max_retries": "HTTP_MAX_RETRIES",
+    "wos_export_paths": "WOS_EXPORT_PATHS",
+    "data_bundle_dir": "DATA_BUNDLE_DIR",
+    "compact_articles": "COMPACT_ARTICLES",
+    "collector_total_budget": "COLLECTOR_TOTAL_BUDGET",
+    "http_cache": "HTTP_CACHE_ENABLED",
+    "http_cache_max_mb": "HTTP_CACHE_MAX_MB",
+    "http_offline": "HTTP_OFFLINE",
+}
+
+
+def configure(keys_file: str = "keys.json", config: dict = None) -> dict:
+    """
+    Aplica as configurações (do arquivo 'keys_file' ou do dict 'config')
+    às constantes do módulo e devolve o dict carregado. Não valida nem
+    encerra o processo: ver validate_config().
+    """
+    global keys, GITHUB_USERNAME, SCHOLAR_AUTHOR_ID, ORCID_ID, GITHUB_TOKEN
+    global SERPAPI_KEYS_RAW, SERPAPI_KEYS, SCOPUS_API_KEY, SCOPUS_AUTHOR_ID
+    global WOS_API_KEY, WOS_RESEARCHER_ID
+
+    keys = dict(config) if config is not None else load_keys(keys_file)
+
+    GITHUB_USERNAME = keys.get("github_username")
+    SCHOLAR_AUTHOR_ID = keys.get("scholar_author_id")
+    ORCID_ID = keys.get("orcid_id")
+    GITHUB_TOKEN = keys.get("github_token")
+
+    SERPAPI_KEYS_RAW = [
+        keys.get(name)
+        for name in sorted(
+            (k for k in keys if k.startswith("serpapi_api_key")),
+            key=_serpapi_key_order
+        )
+        if isinstance(keys.get(name), str)
+    ]
+    SERPAPI_KEYS = [
+        key for key in SERPAPI_KEYS_RAW
+        if key and "CHAVE" not in key.upper()
+    ]
 
-# ---- Validações NÃO CRÍTICAS (fallback ativado) --------------------------------
-if not SCOPUS_API_KEY or not SCOPUS_AUTHOR_ID:
-    logging.warning(
-        "AVISO: Chaves do Scopus não detectadas ou incompletas. "
-        "Será utilizado fallback (CSV/manual) quando disponível."
-    )
+    SCOPUS_API_KEY = keys.get("scopus_api_key")
+    SCOPUS_AUTHOR_ID = keys.get("scopus_author_id")
+    WOS_API_KEY = keys.get("wos_api_key")
+    WOS_RESEARCHER_ID = keys.get("wos_researcher_id")
 
-if not WOS_API_KEY or not WOS_RESEARCHER_ID:
-    logging.warning(
-        "AVISO: Chaves do Web of Science não detectadas ou incompletas. "
-        "As métricas do WoS serão ignoradas."
-    )
+    _set_cache_dir(keys.get("cache_dir") or ".cache")
+
+    for option, constant in CONFIG_OVERRIDES.items():
+        if keys.get(option) is not None:
+            globals()[constant] = keys[option]
+    COLLECTOR_TIMEOUTS.update(keys.get("collector_timeouts") or {})
+    DAEMON_INTERVALS.update(keys.get("daemon_intervals") or {})
+    HTTP_CACHE_TTLS.update(keys.get("http_cache_ttls") or {})
+
+    return keys
+
+
+# ==============================================================================
+# VALIDAÇÃO DAS CONFIGURAÇÕES
+# ==============================================================================
+# Chaves críticas de cada fonte: (constante, mensagem)
+REQUIRED_CONFIG = {
+    "github": [("GITHUB_USERNAME", "'github_username' não configurado em keys.json.")],
+    "scholar": [
+        ("SCHOLAR_AUTHOR_ID", "'scholar_author_id' não configurado em keys.json."),
+        ("SERPAPI_KEYS", "Nenhuma chave válida da SerpApi encontrada em keys.json."),
+    ],
+    "orcid": [("ORCID_ID", "'orcid_id' não configurado em keys.json.")],
+    "scopus": [
+        ("SCOPUS_API_KEY", "'scopus_api_key' não configurado em keys.json."),
+        ("SCOPUS_AUTHOR_ID", "'scopus_author_id' não configurado em keys.json."),
+    ],
+    "wos": [("WOS_RESEARCHER_ID", "'wos_researcher_id' não configurado em keys.json.")],
+}
+
+
+def validate_config(sources=("github", "scholar", "orcid")) -> bool:
+    """
+    Verifica as chaves críticas das fontes pedidas (por padrão, as que o
+    site exige) e avisa sobre as opcionais ausentes. Retorna False se faltar
+    alguma chave crítica.
+    """
+    ok = True
+    for source in sources:
+        for constant, message in REQUIRED_CONFIG.get(source, []):
+            if not globals()[constant]:
+                logging.critical(f"ERRO CRÍTICO: {message}")
+                ok = False
+
+    # ---- Validações NÃO CRÍTICAS (fallback ativado) ----------------------------
+    if "scopus" not in sources and (not SCOPUS_API_KEY or not SCOPUS_AUTHOR_ID):
+        logging.warning(
+            "AVISO: Chaves do Scopus não detectadas ou incompletas. "
+            "Será utilizado fallback (CSV/manual) quando disponível."
+        )
+
+    if "wos" not in sources and (not WOS_API_KEY or not WOS_RESEARCHER_ID):
+        logging.warning(
+            "AVISO: Chaves do Web of Science não detectadas ou incompletas. "
+            "As métricas do WoS serão ignoradas."
+        )
+
+    return ok
 
 # ==============================================================================
 # FUNÇÕES AUXILIARES
@@ -180,19 +342,21 @@ def normalize_title(title: str) -> str:
     return clean_title
 
 
-def load_json_data(filepath: str):
+def load_json_data(filepath: str, quiet: bool = False):
     """
     Carrega dados JSON de forma segura.
     Retorna None se o arquivo não existir ou estiver inválido.
+    Com 'quiet=True' a ausência do arquivo não gera aviso (caches locais).
     """
     if not filepath or not isinstance(filepath, str):
         logging.error("Caminho inválido para carregamento de JSON.")
         return None
 
     if not os.path.exists(filepath):
-        logging.warning(
-            f"Arquivo '{filepath}' não encontrado. Um novo será criado."
-        )
+        if not quiet:
+            logging.warning(
+                f"Arquivo '{filepath}' não encontrado. Um novo será criado."
+            )
         return None
 
     try:
@@ -213,50 +377,658 @@ def load_json_data(filepath: str):
         return None
 
 
-def calculate_h_index(citations_list) -> int:
+def save_json_data(filepath: str, data) -> bool:
     """
-    Calcula o índice h a partir de uma lista de citações.
+    Salva dados JSON (compactos) de forma atômica, criando a pasta se preciso.
+    Usado pelos caches locais; falhas são apenas registradas no log.
+    """
+    temp_path = f"{filepath}.writing"
+    try:
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, filepath)
+        return True
+
+    except Exception as e:
+        logging.error(f"Erro ao salvar cache '{filepath}': {e}")
+        if os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        return False
+
+
+# ==============================================================================
+# MOTOR DE MÉTRICAS BIBLIOMÉTRICAS (NumPy, JANELAS ARBITRÁRIAS)
+# ==============================================================================
+# Janelas das métricas: "all", "since_AAAA" ou "last_N_years". A ordem
+# define a ordem das colunas em cited_by.table (o frontend usa a primeira
+# janela 'since_*' como período recente). O padrão acompanha a regra do
+# Google Scholar (ano corrente - 5); o Scholar usa sempre a janela do perfil.
+METRIC_WINDOWS = ["all", f"since_{datetime.now().year - 5}"]   # keys.json: 'metric_windows'
+
+# Ordem das linhas de cited_by.table (as três primeiras são lidas por
+# posição no frontend)
+METRIC_NAMES = ("citations", "h_index", "i10_index", "g_index", "m_quotient", "citations_per_paper")
+
+
+def _as_citation_array(citations_list):
+    """Converte uma lista de citações (com possíveis None) em array int64."""
+    if citations_list is None:
+        return np.zeros(0, dtype=np.int64)
+    arr = np.asarray(
+        [int(c) for c in citations_list if c is not None]
+        if not isinstance(citations_list, np.ndarray) else citations_list,
+        dtype=np.int64
+    )
+    return np.clip(arr, 0, None)
+
+
+def h_index_counting(citations) -> int:
+    """
+    Índice h em O(n) por contagem: com n artigos, h <= n, então basta um
+    histograma das citações limitadas a n e uma soma acumulada do topo.
+    """
+    n = citations.size
+    if n == 0:
+        return 0
+    counts = np.bincount(np.minimum(citations, n), minlength=n + 1)
+    at_least = np.cumsum(counts[::-1])[::-1]  # at_least[k] = artigos com >= k citações
+    ks = np.nonzero(at_least[1:] >= np.arange(1, n + 1))[0]
+    return int(ks[-1] + 1) if ks.size else 0
+
+
+def g_index_counting(citations) -> int:
+    """
+    Índice g (maior g com as g publicações mais citadas somando >= g²),
+    ordenando por contagem (histograma) em vez de comparação.
     """
-    if not citations_list:
+    n = citations.size
+    if n == 0:
         return 0
+    hist = np.bincount(citations)
+    ordered = np.repeat(np.arange(hist.size - 1, -1, -1), hist[::-1])  # decrescente
+    cumulative = np.cumsum(ordered)
+    ks = np.nonzero(cumulative >= np.arange(1, n + 1) ** 2)[0]
+    return int(ks[-1] + 1) if ks.size else 0
+
+
+def resolve_metric_window(name: str, reference_year=None):
+    """
+    Converte o nome de uma janela no ano inicial (None = todo o período).
+    Aceita "all", "since_2021"/"desde_2021" e "last_5_years".
+    """
+    reference_year = reference_year or datetime.now().year
+    name = str(name).lower()
+    if name == "all":
+        return None
+    match = re.fullmatch(r"(?:since|desde)_(\d{4})", name)
+    if match:
+        return int(match.group(1))
+    match = re.fullmatch(r"last_(\d+)_years?", name)
+    if match:
+        return reference_year - int(match.group(1)) + 1
+    raise ValueError(f"Janela de métricas inválida: '{name}'")
+
 
-    # Remove valores inválidos e garante inteiros
-    clean_citations = sorted(
-        (int(c) for c in citations_list if c is not None),
-        reverse=True
+def compute_metrics(citations, pub_years=None, windows=None, yearly_matrix=None,
+                    matrix_years=None, reference_year=None):
+    """
+    Calcula, em uma chamada, citações, h, i10, g, m-quotient e citações por
+    artigo para todas as janelas, no formato de 'cited_by.table'.
+
+    - citations:     citações totais de cada artigo (janela "all")
+    - pub_years:     ano de publicação de cada artigo (0 = desconhecido)
+    - yearly_matrix: matriz artigos x anos de citações recebidas por ano;
+                     se presente, a janela conta as citações RECEBIDAS a
+                     partir do ano inicial (mesma semântica do Scholar)
+    - matrix_years:  ano de cada coluna da matriz
+    Sem matriz, a janela considera os artigos PUBLICADOS a partir do ano.
+    """
+    windows = windows or METRIC_WINDOWS
+    reference_year = reference_year or datetime.now().year
+    citations = _as_citation_array(citations)
+    n = citations.size
+
+    pub_years = (
+        np.asarray(pub_years, dtype=np.int64) if pub_years is not None
+        else np.zeros(n, dtype=np.int64)
     )
+    known_years = pub_years[pub_years > 0]
+    first_year = int(known_years.min()) if known_years.size else None
 
-    h = 0
-    for i, citations in enumerate(clean_citations, start=1):
-        if citations >= i:
-            h = i
+    if yearly_matrix is not None:
+        yearly_matrix = np.asarray(yearly_matrix, dtype=np.int64).reshape(n, -1)
+        matrix_years = np.asarray(matrix_years, dtype=np.int64)
+
+    table = {metric: {} for metric in METRIC_NAMES}
+
+    for window in windows:
+        start = resolve_metric_window(window, reference_year)
+
+        if start is None:
+            window_cites = citations
+        elif yearly_matrix is not None:
+            window_cites = yearly_matrix[:, matrix_years >= start].sum(axis=1)
         else:
-            break
+            window_cites = citations[pub_years >= start]
+
+        h = h_index_counting(window_cites)
+        total = int(window_cites.sum())
+
+        # m-quotient: h / anos de carreira (limitados ao tamanho da janela)
+        career = reference_year - first_year + 1 if first_year else 0
+        if start is not None and career:
+            career = min(career, reference_year - start + 1)
+
+        table["citations"][window] = total
+        table["h_index"][window] = h
+        table["i10_index"][window] = int(np.count_nonzero(window_cites >= 10))
+        table["g_index"][window] = g_index_counting(window_cites)
+        table["m_quotient"][window] = round(h / career, 2) if career > 0 else 0
+        table["citations_per_paper"][window] = round(total / window_cites.size, 2) if window_cites.size else 0
+
+    return [{metric: table[metric]} for metric in METRIC_NAMES]
+
+
+def citation_metric_series(yearly_matrix, matrix_years) -> dict:
+    """
+    Série anual de h-index e i10 a partir da matriz artigos x anos de
+    citações recebidas por ano: {ano: {"h_index": h, "i10_index": i10}}.
+
+    As citações acumuladas só crescem de um ano para o outro, logo o h
+    também só cresce: cada ano parte do h anterior e apenas testa h+1,
+    h+2... sobre a coluna acumulada. O custo total fica em (anos + h final)
+    contagens vetorizadas, sem reordenar os artigos a cada ano.
+    """
+    yearly_matrix = np.asarray(yearly_matrix, dtype=np.int64)
+    if yearly_matrix.ndim != 2 or yearly_matrix.size == 0:
+        return {}
 
-    return h
+    cumulative = np.cumsum(yearly_matrix, axis=1)
+    series = {}
+    h = 0
+    for col, year in enumerate(matrix_years):
+        column = cumulative[:, col]
+        while np.count_nonzero(column >= h + 1) >= h + 1:
+            h += 1
+        series[int(year)] = {
+            "h_index": h,
+            "i10_index": int(np.count_nonzero(column >= 10))
+        }
+    return series
+
+
+def add_metric_series(graph_data, series):
+    """
+    Grava h_index/i10_index da série em cada ponto do gráfico. Anos sem
+    coluna na matriz repetem o último valor conhecido (0 antes do início).
+    """
+    if not series:
+        return graph_data
+    years = sorted(series)
+    idx, last = 0, {"h_index": 0, "i10_index": 0}
+    for point in sorted(graph_data, key=lambda p: p["year"]):
+        while idx < len(years) and years[idx] <= point["year"]:
+            last = series[years[idx]]
+            idx += 1
+        point.update(last)
+    return graph_data
+
+
+def publication_years(articles) -> list:
+    """Ano de publicação (int, 0 se desconhecido) de cada artigo."""
+    return [get_year_safe(a.get("year")) for a in articles]
+
+
+def dense_citation_matrix(vectors, start_year):
+    """
+    Matriz artigos x anos a partir de vetores densos de citações por ano
+    iniciados em 'start_year' (vetores de tamanhos diferentes são
+    completados com zeros). Retorna (matriz, anos).
+    """
+    width = max((len(v) for v in vectors), default=0)
+    matrix = np.zeros((len(vectors), width), dtype=np.int64)
+    for row, values in enumerate(vectors):
+        if values:
+            matrix[row, :len(values)] = values
+    return matrix, np.arange(start_year, start_year + width)
+
+
+def sparse_citation_matrix(sparse_rows):
+    """
+    Matriz artigos x anos a partir de listas esparsas [(ano, citações)]
+    por artigo. Retorna (matriz, anos).
+    """
+    years = sorted({y for row in sparse_rows for y, _ in row})
+    column = {y: i for i, y in enumerate(years)}
+    matrix = np.zeros((len(sparse_rows), len(years)), dtype=np.int64)
+    for row, pairs in enumerate(sparse_rows):
+        for y, c_val in pairs:
+            matrix[row, column[y]] += c_val
+    return matrix, np.asarray(years, dtype=np.int64)
+
+
+def calculate_h_index(citations_list) -> int:
+    """
+    Calcula o índice h a partir de uma lista de citações.
+    """
+    citations = _as_citation_array(citations_list)
+    if citations.size == 0:
+        return 0
+
+    return h_index_counting(citations)
 
 
 def calculate_i10(citations_list) -> int:
     """
     Calcula o índice i10 (número de publicações com >=10 citações).
     """
-    if not citations_list:
+    citations = _as_citation_array(citations_list)
+    if citations.size == 0:
         return 0
 
-    return sum(
-        1 for c in citations_list
-        if c is not None and int(c) >= 10
+    return int(np.count_nonzero(citations >= 10))
+
+
+# ==============================================================================
+# CAMADA HTTP COMPARTILHADA (POOL DE CONEXÕES + RETRY COM BACKOFF)
+# ==============================================================================
+HTTP_DEFAULT_TIMEOUT = 25
+HTTP_MAX_RETRIES = 3   # keys.json: 'http_max_retries'
+HTTP_BACKOFF_BASE = 0.5   # segundos
+HTTP_BACKOFF_MAX = 20.0   # teto de espera entre tentativas
+HTTP_POOL_SIZE = 10       # conexões keep-alive por host
+HTTP_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_http_sessions = {}
+_http_sessions_lock = threading.Lock()
+
+
+# ------------------------------------------------------------------------------
+# Cancelamento cooperativo das coletas
+# ------------------------------------------------------------------------------
+class CollectorCancelled(Exception):
+    """A coleta em andamento passou do prazo e foi abandonada pelo orquestrador."""
+
+
+# Event de cancelamento da tarefa de coleta corrente (definido por run_collectors)
+_collector_cancel = contextvars.ContextVar("collector_cancel", default=None)
+
+
+def collector_cancelled() -> bool:
+    """True se a tarefa de coleta corrente foi cancelada."""
+    event = _collector_cancel.get()
+    return event is not None and event.is_set()
+
+
+def check_cancelled():
+    """Interrompe a coleta corrente (CollectorCancelled) se ela foi cancelada."""
+    if collector_cancelled():
+        raise CollectorCancelled("coleta cancelada (prazo esgotado)")
+
+
+def cancellable_sleep(seconds: float):
+    """time.sleep() que acorda (com CollectorCancelled) quando a coleta é cancelada."""
+    event = _collector_cancel.get()
+    if event is None:
+        time.sleep(seconds)
+    elif event.wait(seconds):
+        check_cancelled()
+
+
+def submit_in_context(pool, func, *args, **kwargs):
+    """pool.submit() que leva o contexto da coleta (cancelamento) para a thread."""
+    return pool.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+def get_http_session(url: str) -> "requests.Session":
+    """
+    Retorna a sessão HTTP (keep-alive) associada ao host da URL.
+    Cada host tem seu próprio pool, reaproveitado por todos os coletores.
+    """
+    host = urlsplit(url).netloc.lower()
+
+    with _http_sessions_lock:
+        session = _http_sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=HTTP_POOL_SIZE,
+                max_retries=0
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "Accept-Encoding": "gzip, deflate",
+                "User-Agent": "WevertonGomesCosta.github.io/update_fallback"
+            })
+            _http_sessions[host] = session
+
+    return session
+
+
+def _retry_delay(attempt: int, response=None) -> float:
+    """
+    Calcula a espera antes da próxima tentativa.
+    Respeita 'Retry-After' quando presente; senão usa backoff exponencial
+    com jitter completo (evita que várias threads repitam ao mesmo tempo).
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.strip().isdigit():
+            return min(float(retry_after), HTTP_BACKOFF_MAX)
+
+    ceiling = min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+# ------------------------------------------------------------------------------
+# Cache de respostas em disco (entre execuções)
+# ------------------------------------------------------------------------------
+# Validade (segundos) das respostas 200 de cada host; hosts ausentes (ou 0)
+# não são guardados. keys.json: 'http_cache_ttls' (atualiza este dict).
+HTTP_CACHE_TTLS = {
+    "serpapi.com": 12 * 3600,
+    "api.elsevier.com": 12 * 3600,
+    "pub.orcid.org": 12 * 3600,
+    "api.github.com": 300,    # o GitHub já usa requisições condicionais (ETag)
+}
+HTTP_CACHE_ENABLED = True   # keys.json: 'http_cache'
+HTTP_CACHE_MAX_MB = 200     # keys.json: 'http_cache_max_mb' (descarta as menos usadas)
+HTTP_OFFLINE = False        # CLI: --offline (só responde do cache, sem rede)
+
+# Parâmetros com credenciais ficam fora da chave (e do arquivo gravado)
+HTTP_CACHE_SECRET_PARAMS = {"api_key", "apikey", "access_token", "insttoken", "token"}
+# Únicos cabeçalhos da requisição que mudam o conteúdo da resposta
+HTTP_CACHE_KEY_HEADERS = {"accept"}
+# Cabeçalhos que não valem para o corpo já decodificado
+HTTP_CACHE_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "set-cookie"}
+
+_http_cache_lock = threading.Lock()
+_http_cache_bytes = None  # tamanho total do diretório (calculado na primeira gravação)
+
+
+def http_cache_key(url: str, params=None, headers=None, method: str = "GET") -> str:
+    """
+    Chave do cache: método, URL sem query e parâmetros (da URL e de
+    'params') ordenados, sem os que carregam credenciais, mais os
+    cabeçalhos de HTTP_CACHE_KEY_HEADERS.
+    """
+    parts = urlsplit(url)
+    pairs = parse_qsl(parts.query, keep_blank_values=True)
+    items = params.items() if isinstance(params, dict) else (params or [])
+    for name, value in items:
+        if value is None:
+            continue
+        for item in value if isinstance(value, (list, tuple)) else [value]:
+            pairs.append((name, item))
+
+    query = sorted(
+        (str(name), str(value)) for name, value in pairs
+        if str(name).lower() not in HTTP_CACHE_SECRET_PARAMS
+    )
+    key_headers = sorted(
+        (name.lower(), str(value)) for name, value in (headers or {}).items()
+        if name.lower() in HTTP_CACHE_KEY_HEADERS
     )
+    base = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, "", ""))
+    payload = json.dumps([method.upper(), base, query, key_headers], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _http_cache_path(key: str) -> str:
+    return os.path.join(HTTP_CACHE_DIR, f"{key}.json")
+
+
+def _http_cache_load(key: str, ttl: float):
+    """
+    Resposta guardada para 'key' como 'requests.Response', ou None se não
+    existir ou tiver expirado (no modo offline a validade é ignorada).
+    """
+    path = _http_cache_path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        content = base64.b64decode(entry["content"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if not HTTP_OFFLINE and time.time() - entry.get("fetched_at", 0) > ttl:
+        return None
+
+    try:
+        os.utime(path)  # mtime = último uso (ordem de descarte)
+    except OSError:
+        pass
+
+    response = requests.Response()
+    response.status_code = entry.get("status", 200)
+    response.headers = requests.structures.CaseInsensitiveDict(entry.get("headers") or {})
+    response.encoding = entry.get("encoding")
+    response.url = entry.get("url")
+    response._content = content
+    response.from_cache = True  # não gastou quota (ver _scholar_request)
+    return response
+
+
+def _http_cache_evict() -> int:
+    """
+    Remove as entradas usadas há mais tempo (mtime) até o diretório caber
+    em HTTP_CACHE_MAX_MB. Chamar com _http_cache_lock. Retorna quantas saíram.
+    """
+    global _http_cache_bytes
+    entries = []
+    with os.scandir(HTTP_CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    budget = HTTP_CACHE_MAX_MB * 1024 * 1024
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= budget:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+
+    _http_cache_bytes = total
+    if removed:
+        logging.debug(f"    [HTTP] Cache: {removed} respostas antigas descartadas ({total / 1048576:.0f} MiB).")
+    return removed
+
+
+def _http_cache_store(key: str, url: str, response):
+    """Grava uma resposta 200 no cache (URL sem query: credenciais não vão para o disco)."""
+    global _http_cache_bytes
+    parts = urlsplit(url)
+    entry = {
+        "url": urlunsplit((parts.scheme, parts.netloc, parts.path, "", "")),
+        "status": response.status_code,
+        "headers": {
+            name: value for name, value in response.headers.items()
+            if name.lower() not in HTTP_CACHE_DROP_HEADERS
+        },
+        "encoding": response.encoding,
+        "fetched_at": time.time(),
+        "content": base64.b64encode(response.content).decode("ascii")
+    }
+    payload = json.dumps(entry, separators=(",", ":")).encode("utf-8")
+    path = _http_cache_path(key)
+
+    try:
+        with _http_cache_lock:
+            os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+            if _http_cache_bytes is None:
+                _http_cache_evict()
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            _write_bytes_atomic(path, payload)
+            _http_cache_bytes += len(payload) - previous
+            if _http_cache_bytes > HTTP_CACHE_MAX_MB * 1024 * 1024:
+                _http_cache_evict()
+    except OSError as e:
+        logging.debug(f"    [HTTP] Falha ao gravar no cache: {e}")
+
+
+def http_get(url: str, params=None, headers=None, timeout=HTTP_DEFAULT_TIMEOUT, retries=None,
+             retry_status=None, cache=True):
+    """
+    GET através do pool compartilhado, com retry em falhas transitórias
+    (timeout, conexão resetada, 429 e 5xx). 'retry_status' substitui o
+    conjunto de status repetidos (ex.: sem 429 quando ele indica quota).
+
+    Respostas 200 dos hosts em HTTP_CACHE_TTLS são servidas do cache em
+    disco enquanto válidas ('cache=False' ignora o cache, ex.: consultas
+    de quota). Respostas servidas do cache têm 'from_cache = True'. No modo
+    offline (HTTP_OFFLINE) só o cache é usado e a ausência da resposta vira
+    ConnectionError.
+
+    Retorna o último 'Response' obtido (o chamador decide o que fazer com
+    status de erro). Se todas as tentativas falharem por exceção de rede,
+    a última exceção é propagada. Se a coleta corrente for cancelada,
+    levanta CollectorCancelled em vez de ir à rede.
+    """
+    host = urlsplit(url).netloc.lower()
+    ttl = HTTP_CACHE_TTLS.get(host, 0) if HTTP_CACHE_ENABLED else 0
+    key = http_cache_key(url, params, headers) if cache and (ttl or HTTP_OFFLINE) else None
+
+    if key:
+        cached = _http_cache_load(key, ttl)
+        if cached is not None:
+            logging.debug(f"    [HTTP] Cache: {host}{urlsplit(url).path}")
+            return cached
+    if HTTP_OFFLINE:
+        raise requests.exceptions.ConnectionError(f"Modo offline: resposta de {host} não está no cache.")
+    check_cancelled()
+
+    retries = HTTP_MAX_RETRIES if retries is None else retries
+    retry_status = HTTP_RETRY_STATUS if retry_status is None else retry_status
+    session = get_http_session(url)
+
+    for attempt in range(retries + 1):
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt >= retries:
+                raise
+            delay = _retry_delay(attempt)
+            logging.warning(f"    [HTTP] {e.__class__.__name__} em {urlsplit(url).netloc}. Nova tentativa em {delay:.1f}s...")
+            cancellable_sleep(delay)
+            continue
+
+        if response.status_code in retry_status and attempt < retries:
+            delay = _retry_delay(attempt, response)
+            logging.warning(f"    [HTTP] Status {response.status_code} em {urlsplit(url).netloc}. Nova tentativa em {delay:.1f}s...")
+            response.close()
+            cancellable_sleep(delay)
+            continue
+
+        if key and ttl and response.status_code == 200:
+            _http_cache_store(key, url, response)
+        return response
 
 
 # ==============================================================================
 # FUNÇÕES DE BUSCA DE DADOS - GITHUB
 # ==============================================================================
 
+def _format_github_repo(repo: dict, username: str) -> dict:
+    """Converte um repositório da API do GitHub para o formato do frontend."""
+    homepage_url = repo.get("homepage")
+
+    # GitHub Pages fallback
+    if not homepage_url and repo.get("has_pages"):
+        homepage_url = f"https://{username}.github.io/{repo.get('name', '')}/"
+
+    return {
+        "name": repo.get("name"),
+        "html_url": repo.get("html_url"),
+        "homepage": homepage_url,
+        "description": repo.get("description"),
+        "language": repo.get("language"),
+        "stargazers_count": repo.get("stargazers_count", 0),
+        "forks_count": repo.get("forks_count", 0),
+        "updated_at": repo.get("updated_at"),
+        "topics": repo.get("topics", [])
+    }
+
+
+GITHUB_PAGE_WORKERS = 4  # páginas buscadas em paralelo após a primeira
+
+
+def _github_last_page(response) -> int:
+    """Extrai o número da última página do cabeçalho 'Link' do GitHub."""
+    last = response.links.get("last", {}).get("url")
+    if not last:
+        return 1
+    page = parse_qs(urlsplit(last).query).get("page", ["1"])[0]
+    return int(page) if page.isdigit() else 1
+
+
+def _fetch_github_page(api_url, params, headers, username, page, cached_page):
+    """
+    Busca uma página de repositórios com requisição condicional.
+    Retorna (dados_da_página, response); 'dados_da_página' segue o formato
+    do cache ({'etag', 'last_modified', 'repos'}) ou None em caso de falha.
+    Em '304 Not Modified' devolve a própria entrada do cache.
+    """
+    page_headers = dict(headers)
+    if cached_page:
+        if cached_page.get("etag"):
+            page_headers["If-None-Match"] = cached_page["etag"]
+        if cached_page.get("last_modified"):
+            page_headers["If-Modified-Since"] = cached_page["last_modified"]
+
+    response = http_get(
+        api_url,
+        headers=page_headers,
+        params={**params, "page": page},
+        timeout=20
+    )
+
+    if response.status_code == 304 and cached_page:
+        return cached_page, response
+
+    if response.status_code != 200:
+        return None, response
+
+    repos = response.json()
+    if not isinstance(repos, list):
+        return None, response
+
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "repos": [
+            _format_github_repo(repo, username)
+            for repo in repos
+            if isinstance(repo, dict)
+        ]
+    }, response
+
+
 def fetch_github_repos(username: str):
     """
     Busca os repositórios públicos de um usuário no GitHub.
-    Retorna lista vazia em caso de falha (não interrompe o pipeline).
+
+    Segue a paginação do cabeçalho 'Link' até a última página: a primeira
+    resposta revela o total de páginas e as demais são buscadas em
+    paralelo, sendo unidas na ordem original ('sort=pushed').
+
+    Cada página usa requisição condicional (ETag / If-Modified-Since) com
+    os validadores salvos em GITHUB_CACHE_FILE: um '304 Not Modified'
+    reaproveita a página em cache e não consome o rate limit do GitHub.
+    Em caso de falha (incluindo 403 por rate limit) devolve a lista em
+    cache, ou lista vazia se não houver (não interrompe o pipeline).
     """
     if not username:
         logging.error("Usuário do GitHub não informado.")
@@ -264,6 +1036,16 @@ def fetch_github_repos(username: str):
 
     logging.info("Buscando repositórios do GitHub...")
 
+    cache = load_json_data(GITHUB_CACHE_FILE, quiet=True) or {}
+    if cache.get("username") != username or "pages" not in cache:
+        cache = {}
+    cached_pages = cache.get("pages") or {}
+    cached_repos = [
+        repo
+        for page in sorted(cached_pages, key=int)
+        for repo in cached_pages[page].get("repos", [])
+    ]
+
     api_url = f"https://api.github.com/users/{username}/repos"
     params = {
         "sort": "pushed",
@@ -278,11 +1060,8 @@ def fetch_github_repos(username: str):
         headers["Authorization"] = f"token {GITHUB_TOKEN}"
 
     try:
-        response = requests.get(
-            api_url,
-            headers=headers,
-            params=params,
-            timeout=20
+        first_page, response = _fetch_github_page(
+            api_url, params, headers, username, 1, cached_pages.get("1")
         )
 
         # Rate limit explícito
@@ -296,117 +1075,334 @@ def fetch_github_repos(username: str):
                 )
             else:
                 logging.error("Limite de requisições do GitHub atingido (403).")
-            return []
+            if cached_repos:
+                logging.warning(f"    [GitHub] Usando {len(cached_repos)} repositórios do cache.")
+            return cached_repos
 
-        response.raise_for_status()
-        repos = response.json()
-
-        if not isinstance(repos, list):
+        if first_page is None:
+            response.raise_for_status()
             logging.error("Resposta inesperada da API do GitHub.")
-            return []
+            return cached_repos
 
-        formatted_repos = []
-
-        for repo in repos:
-            if not isinstance(repo, dict):
-                continue
-
-            homepage_url = repo.get("homepage")
-
-            # GitHub Pages fallback
-            if not homepage_url and repo.get("has_pages"):
-                homepage_url = f"https://{username}.github.io/{repo.get('name', '')}/"
-
-            formatted_repos.append({
-                "name": repo.get("name"),
-                "html_url": repo.get("html_url"),
-                "homepage": homepage_url,
-                "description": repo.get("description"),
-                "language": repo.get("language"),
-                "stargazers_count": repo.get("stargazers_count", 0),
-                "forks_count": repo.get("forks_count", 0),
-                "updated_at": repo.get("updated_at"),
-                "topics": repo.get("topics", [])
+        # 304 normalmente não traz 'Link': usa o total de páginas do cache
+        if response.status_code == 304:
+            last_page = cache.get("last_page", 1)
+        else:
+            last_page = _github_last_page(response)
+
+        pages = {1: first_page}
+        not_modified = int(response.status_code == 304)
+
+        if last_page > 1:
+            with ThreadPoolExecutor(max_workers=min(GITHUB_PAGE_WORKERS, last_page - 1)) as pool:
+                futures = {
+                    submit_in_context(
+                        pool, _fetch_github_page, api_url, params, headers,
+                        username, page, cached_pages.get(str(page))
+                    ): page
+                    for page in range(2, last_page + 1)
+                }
+                for future, page in futures.items():
+                    page_data, page_response = future.result()
+                    if page_data is None:
+                        logging.error(
+                            f"Falha na página {page} do GitHub "
+                            f"(status {page_response.status_code})."
+                        )
+                        if cached_repos:
+                            logging.warning(f"    [GitHub] Usando {len(cached_repos)} repositórios do cache.")
+                            return cached_repos
+                        continue
+                    pages[page] = page_data
+                    not_modified += int(page_response.status_code == 304)
+
+        if not_modified == last_page and cached_repos:
+            logging.info(f"✓ GitHub: 304 Not Modified. Reutilizando {len(cached_repos)} repositórios em cache.")
+            return cached_repos
+
+        formatted_repos = [
+            repo
+            for page in sorted(pages)
+            for repo in pages[page]["repos"]
+        ]
+
+        if len(pages) == last_page:
+            save_json_data(GITHUB_CACHE_FILE, {
+                "username": username,
+                "last_page": last_page,
+                "pages": {str(page): data for page, data in pages.items()}
             })
 
-        logging.info(f"✓ {len(formatted_repos)} repositórios do GitHub encontrados.")
+        logging.info(
+            f"✓ {len(formatted_repos)} repositórios do GitHub encontrados "
+            f"({last_page} página(s), {not_modified} sem alteração)."
+        )
         return formatted_repos
 
     except requests.exceptions.Timeout:
         logging.error("Timeout ao conectar à API do GitHub.")
-        return []
+        return cached_repos
 
     except requests.exceptions.RequestException as e:
         logging.error(f"Erro ao buscar repositórios do GitHub: {e}")
-        return []
+        return cached_repos
 
 
 # ==============================================================================
 # FUNÇÕES DE BUSCA DE DADOS – GOOGLE SCHOLAR (SerpApi - Com Gráfico Híbrido)
 # ==============================================================================
 
-def fetch_scholar_data(author_id: str, api_key: str):
+SERPAPI_SEARCH_URL = "https://serpapi.com/search.json"
+SERPAPI_ACCOUNT_URL = "https://serpapi.com/account.json"
+
+# Mensagens da SerpApi que indicam chave sem quota ou inválida
+SERPAPI_EXHAUSTED_MARKERS = ("run out of searches", "invalid api key", "searches per hour")
+
+
+class SerpApiKeyPool:
     """
-    Busca dados do Google Scholar via SerpApi.
-    Retorna estrutura com 'total_publications' e gráfico contendo
-    tanto citações quanto número de publicações por ano.
+    Pool de chaves da SerpApi com controle da quota restante de cada uma.
+
+    A quota inicial vem do endpoint de conta da SerpApi (que não consome
+    buscas); se ele não responder, a chave fica com quota desconhecida e
+    passa a ser contada localmente. Cada requisição usa a chave com mais
+    folga, então a troca de chave acontece entre páginas sem perder o
+    progresso da paginação.
     """
-    if not author_id or not api_key:
-        logging.warning("Scholar: author_id ou api_key ausente.")
-        return None
 
-    logging.info(f"--- Iniciando módulo Google Scholar para ID: {author_id} ---")
+    def __init__(self, api_keys, check_account=True):
+        self._lock = threading.Lock()
+        self._remaining = {key: None for key in api_keys if key}  # None = desconhecida
+        self._used = {key: 0 for key in self._remaining}
+        self._exhausted = set()
+        if check_account:
+            self.refresh()
+
+    @staticmethod
+    def _mask(key: str) -> str:
+        return f"{key[:4]}…" if key else "?"
+
+    def refresh(self):
+        """Consulta a quota restante de cada chave no endpoint de conta."""
+        for key in list(self._remaining):
+            status, left = None, None
+            try:
+                response = http_get(SERPAPI_ACCOUNT_URL, params={"api_key": key}, timeout=15, retries=1, cache=False)
+                status = response.status_code
+                data = response.json() if status == 200 else {}
+                left = data.get("total_searches_left", data.get("plan_searches_left"))
+            except CollectorCancelled:
+                raise
+            except Exception as e:
+                logging.warning(f"    [SerpApi] Não foi possível consultar a conta {self._mask(key)}: {e}")
+
+            with self._lock:
+                if status == 401:
+                    self._exhausted.add(key)
+                elif isinstance(left, int):
+                    self._remaining[key] = left
+                    if left <= 0:
+                        self._exhausted.add(key)
+
+        logging.info(f"    [SerpApi] Quota por chave: {self.summary()}")
+
+    def acquire(self):
+        """Retorna a chave com mais quota restante (None se todas esgotaram)."""
+        with self._lock:
+            order = list(self._remaining)
+            candidates = [k for k in order if k not in self._exhausted]
+            if not candidates:
+                return None
+
+            # Quota conhecida vem antes da desconhecida; empate mantém a ordem do keys.json
+            def _rank(k):
+                left = self._remaining[k]
+                return (left is not None, left or 0, -order.index(k))
+
+            return max(candidates, key=_rank)
+
+    def record_use(self, key):
+        """Contabiliza localmente uma busca feita com a chave."""
+        with self._lock:
+            self._used[key] = self._used.get(key, 0) + 1
+            if self._remaining.get(key) is not None:
+                self._remaining[key] -= 1
+                if self._remaining[key] <= 0:
+                    self._exhausted.add(key)
+
+    def mark_exhausted(self, key):
+        """Retira a chave do rodízio (quota esgotada ou chave inválida)."""
+        with self._lock:
+            self._exhausted.add(key)
+            self._remaining[key] = 0
+        logging.warning(f"    [SerpApi] Chave {self._mask(key)} esgotada. Trocando de chave...")
+
+    def summary(self) -> str:
+        with self._lock:
+            return ", ".join(
+                f"{self._mask(k)}={'?' if v is None else v}"
+                f"{' (esgotada)' if k in self._exhausted else ''}"
+                for k, v in self._remaining.items()
+            )
 
-    BASE_URL = "https://serpapi.com/search.json"
+    def __len__(self):
+        return len(self._remaining)
+
+
+def _scholar_request(params, key_pool):
+    """
+    Faz uma busca na SerpApi escolhendo a chave com mais quota no pool.
+    Se a chave estiver esgotada, troca de chave e repete a mesma página.
+    Retorna o JSON da resposta ou None.
+    """
+    while True:
+        api_key = key_pool.acquire()
+        if not api_key:
+            logging.error("Scholar: todas as chaves da SerpApi estão esgotadas.")
+            return None
 
-    # ------------------------------------------------------------------
-    # Função auxiliar interna para requests
-    # ------------------------------------------------------------------
-    def _scholar_request(params):
         try:
-            response = requests.get(
-                BASE_URL,
-                params=params,
-                timeout=25
+            response = http_get(
+                SERPAPI_SEARCH_URL,
+                params={**params, "api_key": api_key},
+                timeout=25,
+                retry_status=HTTP_RETRY_STATUS - {429}
             )
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+
+            error = data.get("error", "") if isinstance(data, dict) else ""
+            if response.status_code in (401, 429) or any(
+                marker in str(error).lower() for marker in SERPAPI_EXHAUSTED_MARKERS
+            ):
+                key_pool.mark_exhausted(api_key)
+                continue
+
             response.raise_for_status()
-            data = response.json()
 
             if not isinstance(data, dict):
                 raise ValueError("Resposta inválida da SerpApi")
 
-            if "error" in data:
-                raise RuntimeError(data["error"])
+            if error:
+                raise RuntimeError(error)
 
+            # Respostas do cache em disco não consomem quota da chave
+            if not getattr(response, "from_cache", False):
+                key_pool.record_use(api_key)
             return data
 
         except requests.exceptions.Timeout:
             logging.error("Scholar: timeout na SerpApi.")
             return None
+        except CollectorCancelled:
+            raise
         except Exception as e:
             logging.error(f"Scholar: erro na SerpApi: {e}")
             return None
 
-    # ------------------------------------------------------------------
-    # 1. PERFIL E HISTÓRICO DE CITAÇÕES
-    # ------------------------------------------------------------------
-    logging.info("Buscando perfil e métricas do Scholar...")
-    
-    prof_raw = _scholar_request({
+
+def _clean_scholar_article(art: dict) -> dict:
+    """Converte um artigo bruto da SerpApi para o formato do frontend."""
+    # Extrai ano limpo
+    raw_year = art.get("year") or ""
+    year_str = str(raw_year).split('/')[0].strip() if raw_year else ""
+
+    # Normaliza Citações
+    cites_val = 0
+    raw_cites = art.get("cited_by", {})
+    if isinstance(raw_cites, dict):
+        cites_val = raw_cites.get("value", 0) or 0
+    elif isinstance(raw_cites, int):
+        cites_val = raw_cites
+
+    return {
+        "title": art.get("title"),
+        "year": year_str,
+        "link": art.get("link"),
+        "journalTitle": art.get("publication") or "N/A",
+        "cited_by": {"value": cites_val},
+        "source": "Google Scholar",
+        "doi": None,
+        "doiLink": None
+    }
+
+
+def _scholar_article_key(art: dict) -> str:
+    """Chave de matching de artigos do Scholar: título normalizado + ano."""
+    return f"{normalize_title(art.get('title'))}_{str(art.get('year') or '').strip()}"
+
+
+# Modo incremental: máximo de páginas ordenadas por citações usadas para
+# atualizar (e conferir a existência de) artigos antigos fora das páginas novas
+SCHOLAR_REFRESH_MAX_PAGES = 3
+
+
+def _scholar_cites(art: dict) -> int:
+    """Citações de um artigo do Scholar como int (null/ausente = 0)."""
+    try:
+        return int((art.get("cited_by") or {}).get("value") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def fetch_scholar_data(author_id: str, key_pool, previous_data=None, incremental=True):
+    """
+    Busca dados do Google Scholar via SerpApi.
+    Retorna estrutura com 'total_publications' e gráfico contendo
+    tanto citações quanto número de publicações por ano.
+
+    MODO INCREMENTAL (quando há 'previous_data' com artigos):
+    A lista é paginada por data de publicação ('sort=pubdate') e a
+    paginação para na primeira página que só contém artigos já conhecidos
+    (título normalizado + ano). As citações dos artigos antigos são
+    atualizadas por páginas ordenadas por citações, até cobrir todos os
+    artigos conhecidos (no máximo SCHOLAR_REFRESH_MAX_PAGES). Se a listagem
+    chega ao fim, artigos conhecidos que não aparecem mais no perfil são
+    descartados. Assim o custo de quota cresce com o número de artigos
+    novos, e não com o tamanho do perfil.
+
+    'key_pool' é um SerpApiKeyPool (ou uma única chave em string).
+    """
+    if isinstance(key_pool, str):
+        key_pool = SerpApiKeyPool([key_pool], check_account=False)
+
+    if not author_id or not key_pool or not len(key_pool):
+        logging.warning("Scholar: author_id ou api_key ausente.")
+        return None
+
+    logging.info(f"--- Iniciando módulo Google Scholar para ID: {author_id} ---")
+
+    # ------------------------------------------------------------------
+    # 1. PERFIL E HISTÓRICO DE CITAÇÕES
+    # ------------------------------------------------------------------
+    page_size = 100
+    previous_articles = (previous_data or {}).get("articles") or []
+    incremental = bool(incremental and previous_articles)
+    known_keys = {_scholar_article_key(a) for a in previous_articles}
+
+    base_params = {
         "engine": "google_scholar_author",
         "author_id": author_id,
-        "api_key": api_key,
         "hl": "pt-BR"
-    })
+    }
+    if incremental:
+        base_params["sort"] = "pubdate"
+
+    logging.info("Buscando perfil e métricas do Scholar...")
+
+    # O perfil já devolve a primeira página de artigos ('página zero')
+    prof_raw = _scholar_request({**base_params, "num": page_size}, key_pool)
 
     if not prof_raw:
         return None
 
     cited_by = prof_raw.get("cited_by", {})
     
-    # A. Processa Tabela de Métricas
+    # A. Processa Tabela de Métricas (valores oficiais do perfil)
     raw_table = cited_by.get("table", [])
-    std_table = []
+    official_metrics = {}
     key_map = {
         "citations": "citations", "citações": "citations",
         "h_index": "h_index", "índice_h": "h_index",
@@ -417,15 +1413,10 @@ def fetch_scholar_data(author_id: str, api_key: str):
         if not isinstance(item, dict): continue
         original_key = list(item.keys())[0]
         clean_key = key_map.get(original_key.lower(), original_key.lower())
-        values = item[original_key]
-        since_key = next((k for k in values.keys() if k.startswith("since") or k.startswith("desde")), "since_2021")
-        
-        std_table.append({
-            clean_key: {
-                "all": values.get("all", 0),
-                "since_2021": values.get(since_key, 0)
-            }
-        })
+        for period, value in item[original_key].items():
+            # "desde_2021" (pt-BR) -> "since_2021"
+            window = re.sub(r"^desde_", "since_", period.lower())
+            official_metrics.setdefault(clean_key, {})[window] = value
 
     # B. Processa Histórico de Citações (base para o gráfico)
     yearly_citation_totals = {}
@@ -435,70 +1426,132 @@ def fetch_scholar_data(author_id: str, api_key: str):
             yearly_citation_totals[int(p["year"])] = p.get("citations", 0)
 
     # ------------------------------------------------------------------
-    # 2. LISTA COMPLETA DE ARTIGOS (PAGINAÇÃO)
+    # 2. LISTA DE ARTIGOS (PAGINAÇÃO A PARTIR DA PÁGINA ZERO DO PERFIL)
     # ------------------------------------------------------------------
-    logging.info("Buscando lista completa de publicações...")
-    all_raw_articles = []
-    start = 0
-    page_size = 100
+    if incremental:
+        logging.info(f"Buscando publicações novas (modo incremental, {len(known_keys)} já conhecidas)...")
+    else:
+        logging.info("Buscando lista completa de publicações...")
 
-    while True:
-        page = _scholar_request({
-            "engine": "google_scholar_author",
-            "author_id": author_id,
-            "api_key": api_key,
-            "hl": "pt-BR",
-            "start": start,
-            "num": page_size
-        })
+    fetched_articles = [_clean_scholar_article(a) for a in prof_raw.get("articles", []) or []]
+    last_batch = fetched_articles
+    requests_made = 1
+    listed_all = True  # a paginação por data chegou ao fim do perfil
 
-        if not page: break
-        articles_batch = page.get("articles", [])
-        if not articles_batch: break
+    while len(last_batch) >= page_size:
+        check_cancelled()
+        if incremental and all(_scholar_article_key(a) in known_keys for a in last_batch):
+            listed_all = False
+            break
 
-        all_raw_articles.extend(articles_batch)
+        page = _scholar_request({
+            **base_params,
+            "start": len(fetched_articles),
+            "num": page_size
+        }, key_pool)
+        requests_made += 1
 
-        if len(articles_batch) < page_size:
+        if not page:
+            listed_all = False
             break
-        start += len(articles_batch)
+        last_batch = [_clean_scholar_article(a) for a in page.get("articles", []) or []]
+        if not last_batch: break
+
+        fetched_articles.extend(last_batch)
 
     # ------------------------------------------------------------------
-    # 3. NORMALIZAÇÃO E CONTAGEM DE PUBLICAÇÕES POR ANO
+    # 3. MESCLAGEM INCREMENTAL E CONTAGEM DE PUBLICAÇÕES POR ANO
     # ------------------------------------------------------------------
-    cleaned_articles = []
+    if incremental:
+        fresh_cites = {_scholar_article_key(a): _scholar_cites(a) for a in fetched_articles}
+
+        # Páginas ordenadas por citações atualizam os artigos antigos que
+        # não apareceram nas páginas por data (e mostram se ainda existem).
+        start = 0
+        while not listed_all and start < SCHOLAR_REFRESH_MAX_PAGES * page_size:
+            check_cancelled()
+            if all(k in fresh_cites for k in known_keys):
+                break
+            cites_page = _scholar_request({
+                **{k: v for k, v in base_params.items() if k != "sort"},
+                "start": start,
+                "num": page_size
+            }, key_pool)
+            requests_made += 1
+            batch = [_clean_scholar_article(raw) for raw in (cites_page or {}).get("articles", []) or []]
+            for art in batch:
+                fresh_cites.setdefault(_scholar_article_key(art), _scholar_cites(art))
+            if not cites_page:
+                break
+            if len(batch) < page_size:
+                listed_all = True
+            start += page_size
+
+        merged = {}
+        stale = 0
+        for art in previous_articles:
+            key = _scholar_article_key(art)
+            if key not in fresh_cites:
+                if listed_all:
+                    continue  # não consta mais no perfil
+                stale += 1
+            updated = dict(art)
+            updated["cited_by"] = {"value": fresh_cites.get(key, _scholar_cites(art))}
+            merged[key] = updated
+        removed_count = len(known_keys) - len(merged)
+        new_count = 0
+        for art in fetched_articles:
+            key = _scholar_article_key(art)
+            if key not in merged:
+                new_count += 1
+            merged[key] = art
+
+        cleaned_articles = sorted(merged.values(), key=_scholar_cites, reverse=True)
+        if removed_count > 0:
+            logging.info(f"    [Scholar] {removed_count} publicações não constam mais no perfil e foram removidas.")
+        if stale:
+            logging.warning(
+                f"    [Scholar] {stale} publicações antigas sem contagem atualizada "
+                f"(além de {SCHOLAR_REFRESH_MAX_PAGES} páginas por citações); mantidos os valores anteriores."
+            )
+        logging.info(f"    [Scholar] {new_count} publicações novas; {requests_made} requisições à SerpApi.")
+    else:
+        cleaned_articles = fetched_articles
+
     yearly_pub_counts = {} # {2020: 5, 2021: 12...}
 
-    for art in all_raw_articles:
-        # Extrai ano limpo
-        raw_year = art.get("year") or ""
-        year_str = str(raw_year).split('/')[0].strip() if raw_year else ""
-        
+    for art in cleaned_articles:
         # Contagem para o gráfico
+        year_str = str(art.get("year") or "")
         if year_str.isdigit():
             y_int = int(year_str)
             yearly_pub_counts[y_int] = yearly_pub_counts.get(y_int, 0) + 1
 
-        # Normaliza Citações
-        cites_val = 0
-        raw_cites = art.get("cited_by", {})
-        if isinstance(raw_cites, dict):
-            cites_val = raw_cites.get("value", 0)
-        elif isinstance(raw_cites, int):
-            cites_val = raw_cites
-
-        cleaned_articles.append({
-            "title": art.get("title"),
-            "year": year_str,
-            "link": art.get("link"),
-            "journalTitle": art.get("publication") or "N/A",
-            "cited_by": {"value": cites_val},
-            "source": "Google Scholar",
-            "doi": None, 
-            "doiLink": None 
-        })
-
     logging.info(f"✓ {len(cleaned_articles)} publicações do Scholar encontradas.")
 
+    # O Scholar não expõe citações por artigo e por ano: o motor calcula as
+    # janelas por ano de publicação, e os valores oficiais do perfil (e as
+    # citações por ano do gráfico) prevalecem onde existem. As janelas do
+    # próprio perfil (ex.: "since_2022", que avança todo ano) vêm primeiro,
+    # para o frontend exibir os valores oficiais como período recente.
+    official_windows = [w for values in official_metrics.values() for w in values]
+    scholar_windows = list(dict.fromkeys(official_windows + list(METRIC_WINDOWS)))
+    std_table = compute_metrics(
+        [_scholar_cites(a) for a in cleaned_articles],
+        pub_years=publication_years(cleaned_articles),
+        windows=scholar_windows
+    )
+    for row in std_table:
+        for metric, values in row.items():
+            for window in values:
+                if window in official_metrics.get(metric, {}):
+                    values[window] = official_metrics[metric][window]
+                elif metric == "citations" and yearly_citation_totals:
+                    start = resolve_metric_window(window)
+                    values[window] = sum(
+                        c for y, c in yearly_citation_totals.items() if start is None or y >= start
+                    )
+
     # ------------------------------------------------------------------
     # 4. MONTAGEM DO GRÁFICO FINAL (CITAÇÕES + PUBLICAÇÕES)
     # ------------------------------------------------------------------
@@ -538,76 +1591,214 @@ def fetch_scholar_data(author_id: str, api_key: str):
 # ==============================================================================
 # FUNÇÕES DE BUSCA DE DADOS – ORCID
 # ==============================================================================
-def fetch_orcid_works(orcid_id):
-    """Busca as publicações de um perfil ORCID com verificação rigorosa de nulos."""
+ORCID_API_URL = "https://pub.orcid.org/v3.0"
+ORCID_BULK_SIZE = 100     # limite de put-codes por chamada em /works/{a,b,c}
+ORCID_BULK_WORKERS = 3    # lotes em paralelo
+
+
+def _orcid_value(obj, *path):
+    """Navega em dicts aninhados do ORCID tolerando nulos em qualquer nível."""
+    for key in path:
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+def _normalize_orcid_work(work):
+    """
+    Converte um work-summary (ou um work completo) do ORCID para o formato
+    do frontend. Retorna None se não houver título.
+    """
+    if not work:
+        return None
+
+    # --- PROTEÇÃO EXTRA AQUI ---
+    # O erro acontecia porque summary.get("title") retornava None
+    title = _orcid_value(work, "title", "title", "value")
+    if not title:
+        return None
+    # ---------------------------
+
+    # Extração de DOI
+    doi = None
+    doi_link = None
+    external_ids = (_orcid_value(work, "external-ids", "external-id") or [])
+    for ext in external_ids:
+        if ext and ext.get("external-id-type") == "doi":
+            doi = ext.get("external-id-value")
+            doi_link = _orcid_value(ext, "external-id-url", "value")
+            break
+
+    journal = _orcid_value(work, "journal-title", "value") or "N/A"
+
+    return {
+        "title": title,
+        "doi": doi,
+        "doiLink": doi_link or (f"https://doi.org/{doi}" if doi else None),
+        "year": _orcid_value(work, "publication-date", "year", "value"),
+        "journalTitle": journal,
+        "link": _orcid_value(work, "url", "value"),
+        "source": "ORCID"
+    }
+
+
+def _orcid_work_details(work):
+    """Campos extras disponíveis apenas no registro completo do work."""
+    contributors = []
+    for contrib in _orcid_value(work, "contributors", "contributor") or []:
+        name = _orcid_value(contrib, "credit-name", "value")
+        if name:
+            contributors.append(name)
+
+    external_ids = []
+    for ext in _orcid_value(work, "external-ids", "external-id") or []:
+        if not ext:
+            continue
+        external_ids.append({
+            "type": ext.get("external-id-type"),
+            "value": ext.get("external-id-value"),
+            "url": _orcid_value(ext, "external-id-url", "value"),
+            "relationship": ext.get("external-id-relationship")
+        })
+
+    return {
+        "put_code": work.get("put-code"),
+        "type": work.get("type"),
+        "contributors": contributors,
+        "external_ids": external_ids,
+        "citation_type": _orcid_value(work, "citation", "citation-type")
+    }
+
+
+def fetch_orcid_work_details(orcid_id, put_codes, max_workers=ORCID_BULK_WORKERS):
+    """
+    Busca os registros completos dos works pelo endpoint em lote
+    '/works/{putcode,putcode,...}' (até ORCID_BULK_SIZE por chamada),
+    com alguns lotes em paralelo. Retorna {put_code: work}.
+    """
+    headers = {"Accept": "application/json"}
+    codes = [str(c) for c in put_codes if c is not None]
+    chunks = [codes[i:i + ORCID_BULK_SIZE] for i in range(0, len(codes), ORCID_BULK_SIZE)]
+
+    def _fetch_chunk(chunk):
+        response = http_get(f"{ORCID_API_URL}/{orcid_id}/works/{','.join(chunk)}", headers=headers, timeout=30)
+        response.raise_for_status()
+        return response.json().get("bulk", [])
+
+    details = {}
+    if not chunks:
+        return details
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)), thread_name_prefix="orcid") as pool:
+        futures = {submit_in_context(pool, _fetch_chunk, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                bulk = future.result()
+            except CollectorCancelled:
+                raise
+            except Exception as e:
+                logging.warning(f"    [ORCID] Falha em lote de {len(futures[future])} works: {e}")
+                continue
+            for item in bulk:
+                work = (item or {}).get("work")
+                if work and work.get("put-code") is not None:
+                    details[str(work["put-code"])] = work
+
+    logging.info(f"    [ORCID] {len(details)} registros completos em {len(chunks)} requisição(ões) em lote.")
+    return details
+
+
+def fetch_orcid_works(orcid_id, detailed=False, incremental=True):
+    """
+    Busca as publicações de um perfil ORCID com verificação rigorosa de nulos.
+
+    Com 'detailed=True', coleta os put-codes dos works e busca os registros
+    completos em lote (fetch_orcid_work_details), acrescentando
+    contribuidores, todos os identificadores externos, tipo e citation-type.
+
+    Com 'incremental=True', mantém um snapshot local (ORCID_SNAPSHOT_FILE)
+    indexado por put-code com o 'last-modified-date' de cada grupo: só os
+    grupos novos ou modificados são renormalizados/enriquecidos, e os que
+    sumiram do perfil são descartados.
+    """
     logging.info("Buscando publicações do ORCID...")
-    api_url = f"https://pub.orcid.org/v3.0/{orcid_id}/works"
+    api_url = f"{ORCID_API_URL}/{orcid_id}/works"
     headers = {"Accept": "application/json"}
 
+    snapshot = {}
+    if incremental:
+        cached = load_json_data(ORCID_SNAPSHOT_FILE, quiet=True) or {}
+        if cached.get("orcid_id") == orcid_id:
+            snapshot = cached.get("works") or {}
+
     try:
-        response = requests.get(api_url, headers=headers, timeout=20)
+        response = http_get(api_url, headers=headers, timeout=20)
         response.raise_for_status()
         data = response.json()
-        
-        orcid_works = []
-        for group in data.get("group", []):
+
+        # Um work-summary por grupo, com o timestamp do grupo
+        current = []  # [(put_code, last_modified, summary)]
+        for group in data.get("group", []) or []:
             if not group: continue
             
-            summaries = group.get("work-summary")
-            if not summaries: continue
-            
-            summary = summaries[0]
-            if not summary: continue
+            group_summaries = group.get("work-summary")
+            if not group_summaries or not group_summaries[0]: continue
 
-            # --- PROTEÇÃO EXTRA AQUI ---
-            # O erro acontecia porque summary.get("title") retornava None
-            title_obj = summary.get("title")
-            if not title_obj: continue 
-            
-            title_val = title_obj.get("title")
-            if not title_val: continue
-            
-            title = title_val.get("value")
-            if not title: continue
-            # ---------------------------
-
-            # Extração de DOI
-            doi = None
-            doi_link = None
-            external_ids = summary.get("external-ids", {})
-            # Proteção caso external-ids seja None
-            if external_ids:
-                for ext in external_ids.get("external-id", []):
-                    if ext.get("external-id-type") == "doi":
-                        doi = ext.get("external-id-value")
-                        doi_url = ext.get("external-id-url")
-                        doi_link = doi_url.get("value") if doi_url else None
-                        break
-            
-            year = None
-            pub_date = summary.get("publication-date")
-            if pub_date and pub_date.get("year"):
-                year = pub_date["year"].get("value")
-                
-            journal_obj = summary.get("journal-title")
-            journal = journal_obj.get("value", "N/A") if journal_obj else "N/A"
-            
-            link_obj = summary.get("url")
-            link = link_obj.get("value") if link_obj else None
+            summary = group_summaries[0]
+            last_modified = (
+                _orcid_value(group, "last-modified-date", "value")
+                or _orcid_value(summary, "last-modified-date", "value")
+            )
+            current.append((str(summary.get("put-code")), last_modified, summary))
+
+        # Separa o que pode ser reaproveitado do snapshot
+        changed = []
+        for put_code, last_modified, summary in current:
+            cached = snapshot.get(put_code)
+            up_to_date = (
+                cached is not None
+                and last_modified is not None
+                and cached.get("last_modified") == last_modified
+                # Snapshot sem detalhes não serve para o modo detalhado
+                and (not detailed or "put_code" in (cached.get("entry") or {}))
+            )
+            if not up_to_date:
+                changed.append(put_code)
 
-            orcid_works.append({
-                "title": title,
-                "doi": doi,
-                "doiLink": doi_link or (f"https://doi.org/{doi}" if doi else None),
-                "year": year,
-                "journalTitle": journal,
-                "link": link,
-                "source": "ORCID"
-            })
+        details = {}
+        if detailed and changed:
+            details = fetch_orcid_work_details(orcid_id, changed)
+
+        changed_set = set(changed)
+        new_snapshot = {}
+        orcid_works = []
+        for put_code, last_modified, summary in current:
+            if put_code in changed_set:
+                full_work = details.get(put_code)
+                entry = _normalize_orcid_work(full_work or summary)
+                if entry and full_work:
+                    entry.update(_orcid_work_details(full_work))
+            else:
+                entry = snapshot[put_code].get("entry")
+
+            new_snapshot[put_code] = {"last_modified": last_modified, "entry": entry}
+            if entry:
+                orcid_works.append(entry)
+
+        if incremental:
+            removed = len(set(snapshot) - set(new_snapshot))
+            logging.info(
+                f"    [ORCID] {len(current) - len(changed)} works reaproveitados, "
+                f"{len(changed)} novos/modificados, {removed} removidos."
+            )
+            save_json_data(ORCID_SNAPSHOT_FILE, {"orcid_id": orcid_id, "works": new_snapshot})
 
         logging.info(f"✓ {len(orcid_works)} publicações encontradas no ORCID.")
         return orcid_works
 
+    except CollectorCancelled:
+        raise
     except Exception as e:
         # Loga o erro mas retorna lista vazia para não travar o script
         logging.error(f"Erro ao buscar dados do ORCID: {e}")
@@ -616,6 +1807,213 @@ def fetch_orcid_works(orcid_id):
 # ==============================================================================
 # FUNÇÕES DE BUSCA DE DADOS – SCOPUS (Com Proteção de IP/Home Office)
 # ==============================================================================
+SCOPUS_SEARCH_URL = "https://api.elsevier.com/content/search/scopus"
+# Campos efetivamente mapeados em cleaned_articles (projeção via 'field=')
+SCOPUS_SEARCH_FIELDS = "dc:identifier,dc:title,prism:coverDate,prism:publicationName,prism:doi,citedby-count"
+# Tamanhos de página tentados em ordem (o máximo depende da chave/visão)
+SCOPUS_SEARCH_PAGE_SIZES = (200, 100, 25)
+
+SCOPUS_HISTORY_START_YEAR = 2010
+SCOPUS_CITATIONS_URL = "https://api.elsevier.com/content/abstract/citations"
+SCOPUS_BATCH_SIZE = 20        # IDs por requisição de citation overview
+SCOPUS_HISTORY_WORKERS = 4    # lotes em paralelo
+SCOPUS_BATCH_ATTEMPTS = 3     # tentativas por lote com falha transitória
+
+
+class ElsevierQuotaExhausted(Exception):
+    """A quota da Elsevier acabou e o reset só vem depois do prazo da coleta."""
+
+
+class ElsevierThrottle:
+    """
+    Controle compartilhado da quota anunciada pela Elsevier.
+
+    Lê 'X-RateLimit-Remaining' / 'X-RateLimit-Reset' de cada resposta e,
+    quando a quota acaba, segura as threads até o horário de reset. Se o
+    reset (semanal, em geral) só vem depois de 'deadline' (epoch), levanta
+    ElsevierQuotaExhausted em vez de esperar.
+    ('Retry-After' em 429 já é respeitado pelo http_get.)
+    """
+
+    def __init__(self, deadline=None):
+        self._lock = threading.Lock()
+        self.remaining = None
+        self.reset_at = None
+        self.deadline = deadline
+
+    def reset_delay(self):
+        """Segundos até o reset se a quota acabou; None se ainda há quota."""
+        with self._lock:
+            if self.remaining is None or self.remaining > 0 or not self.reset_at:
+                return None
+            return max(0.0, self.reset_at - time.time())
+
+    def exhausted(self) -> bool:
+        """True se a quota acabou e o reset não chega antes do prazo."""
+        delay = self.reset_delay()
+        return bool(delay) and self.deadline is not None and time.time() + delay > self.deadline
+
+    def wait(self):
+        delay = self.reset_delay()
+        if not delay:
+            return
+        if self.exhausted():
+            raise ElsevierQuotaExhausted(f"quota da Elsevier esgotada; reset em {delay / 3600:.1f}h")
+        logging.warning(f"    [Scopus] Quota da Elsevier esgotada. Aguardando {delay:.0f}s pelo reset...")
+        cancellable_sleep(delay)
+
+    def update(self, response):
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        with self._lock:
+            if remaining and remaining.strip().isdigit():
+                self.remaining = int(remaining)
+            if reset and reset.strip().isdigit():
+                self.reset_at = int(reset)
+
+
+def _fetch_scopus_citation_batch(batch, api_key, date_range_str, throttle):
+    """
+    Busca o citation overview de um lote de Scopus IDs.
+    Retorna (status_http, {scopus_id: [citações por ano]}).
+    """
+    ids_str = ",".join(batch)
+    manual_url = f"{SCOPUS_CITATIONS_URL}?scopus_id={ids_str}&date={date_range_str}&apiKey={api_key}&httpAccept=application/json"
+
+    throttle.wait()
+    resp = http_get(manual_url, timeout=25)
+    throttle.update(resp)
+
+    if resp.status_code != 200:
+        return resp.status_code, {}
+
+    data = resp.json()
+    root = data.get("abstract-citations-response") or data.get("citation-overview") or {}
+
+    # Verifica se o retorno é válido (API de erro retorna XML ou JSON vazio as vezes)
+    matrix_root = root.get("citeInfoMatrix", {}).get("citeInfoMatrixXML", {}).get("citationMatrix", {})
+    cite_info_list = matrix_root.get("citeInfo", [])
+    if isinstance(cite_info_list, dict): cite_info_list = [cite_info_list]
+
+    vectors = {}
+    for position, article_data in enumerate(cite_info_list):
+        raw_sid = article_data.get("dc:identifier") or ""
+        sid = raw_sid.replace("SCOPUS_ID:", "").strip()
+        # Sem identificador, a ordem da resposta segue a ordem do lote
+        if not sid and position < len(batch):
+            sid = batch[position]
+
+        cc_list = article_data.get("cc", [])
+        if isinstance(cc_list, dict): cc_list = [cc_list]
+
+        values = []
+        for item in cc_list:
+            try:
+                values.append(int(item.get("$", "0")))
+            except (TypeError, ValueError, AttributeError):
+                values.append(0)
+        if sid:
+            vectors[sid] = values
+
+    return 200, vectors
+
+
+def load_scopus_citation_cache(start_year=SCOPUS_HISTORY_START_YEAR) -> dict:
+    """
+    Carrega o cache de séries anuais de citações do Scopus.
+    Formato: {scopus_id: {"citedby_count": n, "cc": [citações por ano]}},
+    com o índice 0 de 'cc' correspondendo a 'start_year'.
+    """
+    cache = load_json_data(SCOPUS_CITATIONS_CACHE_FILE, quiet=True) or {}
+    if cache.get("start_year") != start_year:
+        return {}
+    return cache.get("articles") or {}
+
+
+def save_scopus_citation_cache(start_year, articles: dict) -> bool:
+    """Grava o cache de séries anuais de citações do Scopus."""
+    return save_json_data(SCOPUS_CITATIONS_CACHE_FILE, {
+        "start_year": start_year,
+        "articles": articles
+    })
+
+
+def fetch_scopus_citation_history(scopus_ids, api_key, start_year=SCOPUS_HISTORY_START_YEAR,
+                                  max_workers=SCOPUS_HISTORY_WORKERS):
+    """
+    Busca o histórico anual de citações (citeInfoMatrix) dos Scopus IDs em
+    lotes de SCOPUS_BATCH_SIZE, enviados por um pool limitado de threads
+    que respeita a quota anunciada pela Elsevier.
+
+    Lotes com falha transitória (rede, 429, 5xx) são reenviados até
+    SCOPUS_BATCH_ATTEMPTS vezes; recusas (401/403, típicas de restrição de
+    IP) não são repetidas. Se a quota acaba e o reset só vem depois do
+    prazo do coletor, os lotes restantes falham na hora.
+
+    Retorna {"vectors": {scopus_id: [cc...]}, "failed_ids": [...],
+             "batches_ok": n, "batches_failed": n}.
+    """
+    date_range_str = f"{start_year}-{datetime.now().year + 1}"
+    batches = [scopus_ids[i:i + SCOPUS_BATCH_SIZE] for i in range(0, len(scopus_ids), SCOPUS_BATCH_SIZE)]
+    throttle = ElsevierThrottle(deadline=time.time() + COLLECTOR_TIMEOUTS["scopus"])
+
+    result = {"vectors": {}, "failed_ids": [], "batches_ok": 0, "batches_failed": 0}
+    attempts = {idx: 0 for idx in range(len(batches))}
+    to_run = list(attempts)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scopus") as pool:
+        while to_run:
+            check_cancelled()
+            if throttle.exhausted():
+                # Reset da quota só depois do prazo: falha o resto de uma vez
+                logging.warning(f"    [Scopus] Quota da Elsevier esgotada até depois do prazo. {len(to_run)} lote(s) não enviados.")
+                for idx in to_run:
+                    result["batches_failed"] += 1
+                    result["failed_ids"].extend(batches[idx])
+                break
+            futures = {
+                submit_in_context(pool, _fetch_scopus_citation_batch, batches[idx], api_key, date_range_str, throttle): idx
+                for idx in to_run
+            }
+            to_run = []
+
+            for future in as_completed(futures):
+                idx = futures[future]
+                attempts[idx] += 1
+                try:
+                    status, vectors = future.result()
+                except ElsevierQuotaExhausted:
+                    result["batches_failed"] += 1
+                    result["failed_ids"].extend(batches[idx])
+                    continue
+                except CollectorCancelled:
+                    raise
+                except Exception as e:
+                    status, vectors = None, {}
+                    logging.warning(f"    [Scopus] Lote {idx + 1}/{len(batches)} falhou: {e}")
+
+                if status == 200:
+                    result["batches_ok"] += 1
+                    result["vectors"].update(vectors)
+                    continue
+
+                retryable = status is None or status in HTTP_RETRY_STATUS
+                if retryable and attempts[idx] < SCOPUS_BATCH_ATTEMPTS:
+                    to_run.append(idx)
+                    continue
+
+                if status is not None:
+                    logging.warning(f"    [Scopus] API Histórico recusada (Status {status}). Provável restrição de IP.")
+                result["batches_failed"] += 1
+                result["failed_ids"].extend(batches[idx])
+
+    logging.info(
+        f"    [Scopus] Histórico: {result['batches_ok']} lote(s) OK, "
+        f"{result['batches_failed']} com falha, {len(result['vectors'])} artigos com série anual."
+    )
+    return result
+
+
 def fetch_scopus_data(author_id, api_key, previous_data=None):
     """
     Busca dados do Scopus via Elsevier API.
@@ -649,35 +2047,45 @@ def fetch_scopus_data(author_id, api_key, previous_data=None):
     # ==========================================================================
     # 1. LISTA DE ARTIGOS (Search API - Geralmente funciona de casa)
     # ==========================================================================
-    start_index = 0
-    items_per_page = 25
-    has_more_items = True
+    # Paginação por cursor ('cursor=*'): não tem o limite de 5000 resultados
+    # da paginação por 'start' e pede só os campos usados em cleaned_articles.
+    page_sizes = list(SCOPUS_SEARCH_PAGE_SIZES)
+    cursor = "*"
+    total_results = None
+    seen_ids = set()
 
     logging.info("--- [Scopus] Etapa 1: Buscando lista de artigos ---")
 
-    while has_more_items:
+    while True:
+        check_cancelled()
         try:
-            resp = requests.get(
-                "https://api.elsevier.com/content/search/scopus",
+            resp = http_get(
+                SCOPUS_SEARCH_URL,
                 headers=headers,
                 params={
                     "query": f"AU-ID({author_id})",
-                    "count": items_per_page,
-                    "start": start_index,
-                    "view": "STANDARD",
+                    "count": page_sizes[0],
+                    "cursor": cursor,
+                    "field": SCOPUS_SEARCH_FIELDS,
                     "sort": "-citedby-count"
                 },
                 timeout=20
             )
 
+            # Página maior que a permitida pela chave: tenta a próxima menor
+            if resp.status_code == 400 and len(page_sizes) > 1:
+                logging.info(f"    [Scopus] count={page_sizes[0]} recusado pela chave. Tentando {page_sizes[1]}...")
+                page_sizes.pop(0)
+                continue
+
             if resp.status_code != 200:
                 logging.error(f"!!! [Scopus] Erro na API Search. Status: {resp.status_code}")
                 critical_error = True
                 break
 
             data = resp.json().get("search-results", {})
-            total_results = int(data.get("opensearch:totalResults", 0))
-            entries = data.get("entry", [])
+            total_results = int(data.get("opensearch:totalResults", 0) or 0)
+            entries = [e for e in data.get("entry", []) if "error" not in e]
             
             if not entries: break
 
@@ -685,7 +2093,10 @@ def fetch_scopus_data(author_id, api_key, previous_data=None):
                 # ID
                 raw_sid = entry.get("dc:identifier", "")
                 clean_sid = raw_sid.replace("SCOPUS_ID:", "").strip()
+                if clean_sid in seen_ids:
+                    continue
                 if clean_sid:
+                    seen_ids.add(clean_sid)
                     scopus_ids_list.append(clean_sid)
 
                 # Ano de Publicação
@@ -696,7 +2107,7 @@ def fetch_scopus_data(author_id, api_key, previous_data=None):
                     yearly_pub_counts[y_int] = yearly_pub_counts.get(y_int, 0) + 1
 
                 # Dados do Artigo
-                cited_total = int(entry.get("citedby-count", 0))
+                cited_total = int(entry.get("citedby-count", 0) or 0)
                 doi = entry.get("prism:doi")
 
                 cleaned_articles.append({
@@ -710,9 +2121,13 @@ def fetch_scopus_data(author_id, api_key, previous_data=None):
                     "scopus_id": clean_sid 
                 })
 
-            start_index += len(entries)
-            has_more_items = start_index < total_results
+            next_cursor = (data.get("cursor") or {}).get("@next")
+            if not next_cursor or next_cursor == cursor or len(cleaned_articles) >= total_results:
+                break
+            cursor = next_cursor
 
+        except CollectorCancelled:
+            raise
         except Exception as e:
             logging.error(f"!!! [Scopus] Exceção durante a busca: {e}")
             critical_error = True
@@ -726,67 +2141,56 @@ def fetch_scopus_data(author_id, api_key, previous_data=None):
     # ==========================================================================
     # 2. HISTÓRICO DE CITAÇÕES (Bloqueado fora da Universidade)
     # ==========================================================================
-    history_success = False # Flag para saber se conseguimos o detalhe anual
-
-    if scopus_ids_list:
-        logging.info(f"--- [Scopus] Etapa 2: Tentando histórico para {len(scopus_ids_list)} IDs ---")
-        try:
-            START_YEAR = 2010 
-            current_year = datetime.now().year
-            date_range_str = f"{START_YEAR}-{current_year + 1}"
-            
-            base_url = "https://api.elsevier.com/content/abstract/citations"
-            
-            batch_size = 20
-            batches = [scopus_ids_list[i:i + batch_size] for i in range(0, len(scopus_ids_list), batch_size)]
-
-            for batch in batches:
-                ids_str = ",".join(batch)
-                manual_url = f"{base_url}?scopus_id={ids_str}&date={date_range_str}&apiKey={api_key}&httpAccept=application/json"
-                
-                try:
-                    resp = requests.get(manual_url, headers={}, timeout=25)
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        root = data.get("abstract-citations-response") or data.get("citation-overview") or {}
-                        
-                        # Verifica se o retorno é válido (API de erro retorna XML ou JSON vazio as vezes)
-                        matrix_root = root.get("citeInfoMatrix", {}).get("citeInfoMatrixXML", {}).get("citationMatrix", {})
-                        cite_info_list = matrix_root.get("citeInfo", [])
-                        
-                        if isinstance(cite_info_list, dict): cite_info_list = [cite_info_list]
-
-                        for article_data in cite_info_list:
-                            cc_list = article_data.get("cc", [])
-                            if isinstance(cc_list, dict): cc_list = [cc_list]
-                            
-                            for idx, item in enumerate(cc_list):
-                                try:
-                                    val = int(item.get("$", "0"))
-                                    year_mapped = START_YEAR + idx
-                                    if val > 0:
-                                        yearly_citation_totals[year_mapped] = yearly_citation_totals.get(year_mapped, 0) + val
-                                except: pass
-                    else:
-                        logging.warning(f"    [Scopus] API Histórico recusada (Status {resp.status_code}). Provável restrição de IP.")
-                except Exception:
-                    pass
+    START_YEAR = SCOPUS_HISTORY_START_YEAR
+    history = {"vectors": {}, "failed_ids": [], "batches_ok": 0, "batches_failed": 0}
+
+    # Cache por artigo: só consulta os IDs cujo 'citedby-count' mudou desde
+    # a última série anual salva (artigos sem citações nem precisam de série).
+    search_counts = {a["scopus_id"]: a["cited_by"]["value"] for a in cleaned_articles if a.get("scopus_id")}
+    citation_cache = load_scopus_citation_cache(START_YEAR)
+    ids_to_query = [
+        sid for sid in scopus_ids_list
+        if search_counts.get(sid, 0) > 0
+        and citation_cache.get(sid, {}).get("citedby_count") != search_counts[sid]
+    ]
 
-        except Exception as e:
-            logging.error(f"!!! [Scopus] Erro ao conectar na API de histórico: {e}")
+    if ids_to_query:
+        logging.info(
+            f"--- [Scopus] Etapa 2: Tentando histórico para {len(ids_to_query)} IDs "
+            f"({len(scopus_ids_list) - len(ids_to_query)} sem mudança ou sem citações) ---"
+        )
+        history = fetch_scopus_citation_history(ids_to_query, api_key, START_YEAR)
+    elif scopus_ids_list:
+        logging.info("--- [Scopus] Etapa 2: Nenhuma contagem de citações mudou. Histórico 100% do cache ---")
+
+    for sid, cc_values in history["vectors"].items():
+        citation_cache[sid] = {"citedby_count": search_counts.get(sid, 0), "cc": cc_values}
+    for sid in scopus_ids_list:
+        if search_counts.get(sid, 0) == 0:
+            citation_cache[sid] = {"citedby_count": 0, "cc": []}
+
+    # Gráfico agregado reconstruído a partir do cache (IDs atuais apenas)
+    article_vectors = {sid: citation_cache[sid]["cc"] for sid in scopus_ids_list if sid in citation_cache}
+    for cc_values in article_vectors.values():
+        for idx, val in enumerate(cc_values):
+            if val > 0:
+                year_mapped = START_YEAR + idx
+                yearly_citation_totals[year_mapped] = yearly_citation_totals.get(year_mapped, 0) + val
 
     # ==========================================================================
-    # TRAVA DE SEGURANÇA (HOME OFFICE CHECK)
+    # TRAVA DE SEGURANÇA (HOME OFFICE CHECK) - POR LOTE
     # ==========================================================================
-    total_cited_in_search = sum(a["cited_by"]["value"] for a in cleaned_articles)
-    total_cited_in_history = sum(yearly_citation_totals.values())
 
-    # Lógica: Se a busca diz que temos citações (ex: 100), mas o histórico diz 0,
-    # significa que a API de histórico falhou (bloqueio de IP).
-    # Nesse caso, NÃO podemos usar os dados novos, pois o gráfico ficará vazio.
-    if total_cited_in_search > 0 and total_cited_in_history == 0:
+    # Lógica: se havia artigos citados para consultar mas NENHUM lote de
+    # histórico foi aceito, a API de histórico está bloqueada (restrição de
+    # IP). Nesse caso, NÃO podemos usar os dados novos, pois o gráfico
+    # ficará desatualizado. Falhas parciais mantêm os dados novos e listam
+    # os IDs (eles voltam a ser consultados na próxima execução).
+    missing_cited = set(history["failed_ids"])
+
+    if ids_to_query and history["batches_ok"] == 0:
         logging.warning("⚠️  [Scopus] DETECTADO BLOQUEIO DE IP (Home Office).")
-        logging.warning("    A lista de artigos foi baixada, mas o histórico de citações veio vazio.")
+        logging.warning(f"    A lista de artigos foi baixada, mas todos os {history['batches_failed']} lotes de histórico falharam.")
         
         if previous_data:
             logging.warning("    >>> AÇÃO: Descartando dados incompletos e MANTENDO DADOS ANTIGOS.")
@@ -794,40 +2198,49 @@ def fetch_scopus_data(author_id, api_key, previous_data=None):
         else:
             logging.warning("    >>> AÇÃO: Nenhum dado antigo disponível. O gráfico ficará vazio.")
 
+    elif missing_cited:
+        logging.warning(
+            f"⚠️  [Scopus] Histórico incompleto: {len(missing_cited)} artigos citados sem histórico atualizado "
+            f"({history['batches_failed']} lote(s) falharam): {', '.join(sorted(missing_cited))}"
+        )
+
+    save_scopus_citation_cache(START_YEAR, {sid: citation_cache[sid] for sid in article_vectors})
+
     # ==========================================================================
     # 3. FORMATAÇÃO FINAL (Se chegou aqui, os dados são válidos)
     # ==========================================================================
     
-    # Since 2021
-    since_2021_sum = sum(v for k, v in yearly_citation_totals.items() if k >= 2021)
-    
-    # Filtro para índices
-    recent_cites = [a["cited_by"]["value"] for a in cleaned_articles if a["year"].isdigit() and int(a["year"]) >= 2021]
-
-    metrics_table = [
-        {"citations": {"all": total_cited_in_search, "since_2021": since_2021_sum}},
-        {"h_index": {
-            "all": calculate_h_index([a["cited_by"]["value"] for a in cleaned_articles]), 
-            "since_2021": calculate_h_index(recent_cites)
-        }},
-        {"i10_index": {
-            "all": calculate_i10([a["cited_by"]["value"] for a in cleaned_articles]), 
-            "since_2021": calculate_i10(recent_cites)
-        }}
-    ]
+    # Métricas de todas as janelas em uma chamada: a matriz artigos x anos
+    # do histórico conta as citações recebidas em cada janela. Sem nenhum
+    # histórico (bloqueio de IP), as janelas usam o ano de publicação.
+    citation_matrix, matrix_years = None, None
+    if article_vectors:
+        citation_matrix, matrix_years = dense_citation_matrix(
+            [article_vectors.get(a.get("scopus_id"), []) for a in cleaned_articles], START_YEAR
+        )
+
+    metrics_table = compute_metrics(
+        [a["cited_by"]["value"] for a in cleaned_articles],
+        pub_years=publication_years(cleaned_articles),
+        yearly_matrix=citation_matrix,
+        matrix_years=matrix_years
+    )
 
     # Montagem do Gráfico
     graph_data = []
     all_years = sorted(set(yearly_pub_counts.keys()) | set(yearly_citation_totals.keys()))
     
     for y in all_years:
-        if 2010 <= y <= datetime.now().year + 1:
+        if SCOPUS_HISTORY_START_YEAR <= y <= datetime.now().year + 1:
             graph_data.append({
                 "year": y,
                 "citations": yearly_citation_totals.get(y, 0),
                 "publications": yearly_pub_counts.get(y, 0)
             })
 
+    if citation_matrix is not None:
+        add_metric_series(graph_data, citation_metric_series(citation_matrix, matrix_years))
+
     logging.info(f"--- [Scopus] Sucesso! Dados atualizados corretamente. ---")
     
     return {
@@ -846,159 +2259,349 @@ def fetch_scopus_data(author_id, api_key, previous_data=None):
 # FUNÇÕES DE BUSCA DE DADOS – WEB OF SCIENCE (Modo Offline / Fallback)
 # ==============================================================================
 
-def fetch_wos_data(researcher_id, api_key):
+# Exports locais do WoS: arquivos, globs ou pastas (exports fatiados em
+# lotes de 500-1000 registros, ex.: savedrecs.txt, savedrecs (1).txt...)
+WOS_EXPORT_PATHS = ["savedrecs*.txt"]   # keys.json: 'wos_export_paths'
+WOS_EXPORT_EXTENSIONS = (".txt", ".csv", ".tsv")
+WOS_PARSE_WORKERS = os.cpu_count() or 1
+WOS_HEADER_SNIFF_LINES = 10    # linhas de metadados antes do cabeçalho
+
+# Incrementar sempre que o parse ou o processamento do WoS mudar de
+# resultado: invalida o cache de WOS_CACHE_FILE.
+WOS_PARSER_VERSION = 5
+
+# Nomes de coluna aceitos: relatório de citações (nomes longos) e export
+# "Tab-delimited" de registros completos (tags de duas letras).
+WOS_TITLE_COLUMNS = ("Title", "Article Title", "TI")
+WOS_DOI_COLUMNS = ("DOI", "DI")
+WOS_YEAR_COLUMNS = ("Publication Year", "PY")
+WOS_CITES_COLUMNS = ("Times Cited, WoS Core", "Total Citations", "TC", "Z9")
+WOS_UT_COLUMNS = ("UT (Unique WOS ID)", "UT (Unique ID)", "Accession Number", "UT")
+
+
+def _wos_columns(header, names):
+    """Índices das colunas existentes entre 'names', na ordem de preferência."""
+    return [header.index(name) for name in names if name in header]
+
+
+def _is_wos_header(line: str) -> bool:
+    """Reconhece o cabeçalho dos dois formatos de export do WoS."""
+    if "Title" in line and "Authors" in line:
+        return True
+    fields = line.rstrip("\r\n").split("\t")
+    return "TI" in fields and ("AU" in fields or "PT" in fields)
+
+
+def resolve_wos_export_files(sources=None):
     """
-    Processa dados do Web of Science a partir de um arquivo local 'savedrecs.txt'.
-    A API foi removida temporariamente.
+    Expande a lista de exports do WoS (arquivos, globs ou pastas) em uma
+    lista ordenada e sem repetição de arquivos existentes.
     """
-    txt_file = "savedrecs.txt"
-    
-    # Se o arquivo não existir, retorna imediatamente
-    if not os.path.exists(txt_file):
-        logging.warning(f"Arquivo '{txt_file}' não encontrado. WoS será ignorado.")
-        return None
+    if isinstance(sources, str):
+        sources = [sources]
+
+    files = set()
+    for source in sources or WOS_EXPORT_PATHS:
+        if os.path.isdir(source):
+            for name in os.listdir(source):
+                path = os.path.join(source, name)
+                if os.path.isfile(path) and name.lower().endswith(WOS_EXPORT_EXTENSIONS):
+                    files.add(path)
+        else:
+            files.update(p for p in glob.glob(source) if os.path.isfile(p))
 
-    logging.info(f"--- Iniciando módulo Web of Science (Local) ---")
-    logging.info(f"Lendo arquivo: {txt_file}")
+    return sorted(files)
+
+
+def parse_wos_export(txt_file):
+    """
+    Lê um export do Web of Science (TSV ou CSV) em uma única passada.
+
+    O delimitador e a linha do cabeçalho são detectados a partir do prefixo
+    já lido; os índices de título/DOI/ano/citações/UT e das colunas de ano
+    ("1900" ... "2026") são resolvidos uma vez, e cada linha acumula direto
+    em vetores pré-alocados por ano (sem montar um dict por linha).
 
+    Retorna um dict com listas paralelas por artigo ('articles', 'uids' e
+    'year_citations', este com pares esparsos (ano, citações)) e os vetores do arquivo inteiro ('years',
+    'citation_totals'), onde 'citation_totals[i]' soma as citações
+    recebidas no ano 'years[i]'.
+    """
     articles = []
-    
-    # Acumuladores Globais para o Gráfico
-    yearly_citation_totals = {} 
-    yearly_pub_counts = {}
-    
-    # Lista auxiliar para calcular métricas "Since 2021"
-    recent_citations_per_article = [] 
+    uids = []
+    year_citations = []
 
-    try:
+    with open(txt_file, 'r', encoding='utf-8-sig', errors='replace', newline='') as f:
         # ----------------------------------------------------------------------
-        # 1. DETECÇÃO DE FORMATO (Tab vs Vírgula e Cabeçalho)
+        # 1. DETECÇÃO DE FORMATO (Tab vs Vírgula e Cabeçalho) NO PREFIXO
         # ----------------------------------------------------------------------
-        delimiter = '\t' 
-        header_pos = 0
-        
-        # Lê as primeiras linhas para descobrir onde começa o cabeçalho
-        with open(txt_file, 'r', encoding='utf-8-sig', errors='replace') as f:
-            lines = [f.readline() for _ in range(10)]
-            for i, line in enumerate(lines):
-                # O cabeçalho do WoS geralmente contém estes campos
-                if "Title" in line and "Authors" in line:
-                    header_pos = i
-                    # Se tiver aspas com vírgula, provavelmente é CSV, senão é TSV
-                    if '","' in line or ',"' in line: 
-                        delimiter = ','
-                    break
-        
+        delimiter = '\t'
+        header_line = None
+        for _ in range(WOS_HEADER_SNIFF_LINES):
+            line = f.readline()
+            if not line:
+                break
+            # O cabeçalho do WoS geralmente contém estes campos
+            if _is_wos_header(line):
+                header_line = line
+                # Se tiver aspas com vírgula, provavelmente é CSV, senão é TSV
+                if '","' in line or ',"' in line:
+                    delimiter = ','
+                break
+
+        if header_line is None:
+            raise ValueError("cabeçalho do WoS não encontrado")
+
+        header = [h.strip() for h in next(csv.reader([header_line], delimiter=delimiter))]
+
         # ----------------------------------------------------------------------
-        # 2. PROCESSAMENTO DOS DADOS
+        # 2. RESOLUÇÃO DE COLUNAS (UMA VEZ)
         # ----------------------------------------------------------------------
-        with open(txt_file, 'r', encoding='utf-8-sig', errors='replace') as f:
-            # Pula as linhas de metadados antes do cabeçalho
-            for _ in range(header_pos): 
-                next(f)
-            
-            reader = csv.DictReader(f, delimiter=delimiter)
-            
-            for row in reader:
-                # Tenta pegar o título em colunas comuns do WoS
-                title = row.get("Title") or row.get("Article Title")
-                if not title: continue 
-
-                doi = row.get("DOI", "")
-                year_str = row.get("Publication Year", "")
-                
-                # Citações Totais (All Time) - Limpeza de string "1,200" para int 1200
-                raw_cites = row.get("Times Cited, WoS Core") or row.get("Total Citations") or "0"
-                try:
-                    cites_all_time = int(raw_cites.replace(',', '').strip())
-                except:
-                    cites_all_time = 0
-
-                # Adiciona Artigo à lista final
-                articles.append({
-                    "title": title,
-                    "year": year_str,
-                    "doi": doi,
-                    "link": f"https://doi.org/{doi}" if doi else None,
-                    "cited_by": {"value": cites_all_time},
-                    "source": "Web of Science"
-                })
+        title_idx = _wos_columns(header, WOS_TITLE_COLUMNS)
+        doi_idx = (_wos_columns(header, WOS_DOI_COLUMNS) or [None])[0]
+        year_idx = (_wos_columns(header, WOS_YEAR_COLUMNS) or [None])[0]
+        cites_idx = _wos_columns(header, WOS_CITES_COLUMNS)
+        ut_idx = (_wos_columns(header, WOS_UT_COLUMNS) or [None])[0]
 
-                # --- LÓGICA DE GRÁFICO E MÉTRICAS RECENTES ---
-                
-                # A. Contagem de Publicações por Ano (para o Gráfico)
-                if year_str and year_str.isdigit():
-                    y_int = int(year_str)
-                    yearly_pub_counts[y_int] = yearly_pub_counts.get(y_int, 0) + 1
+        # O export do WoS cria uma coluna para cada ano (ex: "2021", "2022").
+        year_cols = [(i, int(h)) for i, h in enumerate(header) if h.isdigit() and len(h) == 4]
+        years = [y for _, y in year_cols]
+        citation_totals = [0] * len(year_cols)
 
-                # B. Iterar colunas dinâmicas para achar anos de citação (ex: "2021", "2022")
-                # O export do WoS cria uma coluna para cada ano que teve citação.
-                cites_recent_for_this_article = 0
-                
-                for key, val in row.items():
-                    # Verifica se a coluna é um ano (4 dígitos numéricos)
-                    if key and key.isdigit() and len(key) == 4:
-                        try:
-                            c_year = int(key)
-                            c_val = int(val) if val and val.strip() else 0
-                            
-                            if c_val > 0:
-                                # 1. Soma ao gráfico global de citações
-                                yearly_citation_totals[c_year] = yearly_citation_totals.get(c_year, 0) + c_val
-                                
-                                # 2. Se for >= 2021, conta para as métricas "Since 2021"
-                                if c_year >= 2021:
-                                    cites_recent_for_this_article += c_val
-                        except:
-                            continue
-                
-                # Guarda o total recente deste artigo para calcular H-index/i10 depois
-                recent_citations_per_article.append(cites_recent_for_this_article)
-
-        logging.info(f"✓ WoS Local: {len(articles)} artigos processados.")
+        # ----------------------------------------------------------------------
+        # 3. PROCESSAMENTO DAS LINHAS
+        # ----------------------------------------------------------------------
+        for row in csv.reader(f, delimiter=delimiter):
+            n_cols = len(row)
 
-    except Exception as e:
-        logging.error(f"Erro ao ler savedrecs.txt: {e}")
-        return None
+            # Tenta pegar o título em colunas comuns do WoS
+            title = next((row[i] for i in title_idx if i < n_cols and row[i]), None)
+            if not title: continue
 
-    if not articles:
-        return None
+            doi = row[doi_idx] if doi_idx is not None and doi_idx < n_cols else ""
+            year_str = row[year_idx] if year_idx is not None and year_idx < n_cols else ""
+            ut = row[ut_idx].strip() if ut_idx is not None and ut_idx < n_cols else ""
 
-    # ==========================================================================
-    # 3. CÁLCULO DE MÉTRICAS (ALL vs SINCE 2021)
-    # ==========================================================================
-    
-    # Lista simples de todas as citações
-    cites_vals_all = [a["cited_by"]["value"] for a in articles]
-    
-    metrics = [
-        {
-            "citations": {
-                "all": sum(cites_vals_all), 
-                "since_2021": sum(recent_citations_per_article) 
-            }
-        },
-        {
-            "h_index": {
-                "all": calculate_h_index(cites_vals_all), 
-                "since_2021": calculate_h_index(recent_citations_per_article)
-            }
-        },
-        {
-            "i10_index": {
-                "all": calculate_i10(cites_vals_all), 
-                "since_2021": calculate_i10(recent_citations_per_article)
-            }
-        }
-    ]
+            # Citações Totais (All Time) - Limpeza de string "1,200" para int 1200
+            raw_cites = next((row[i] for i in cites_idx if i < n_cols and row[i]), "0")
+            try:
+                cites_all_time = int(raw_cites.replace(',', '').strip())
+            except ValueError:
+                cites_all_time = 0
+
+            articles.append({
+                "title": title,
+                "year": year_str,
+                "doi": doi,
+                "link": f"https://doi.org/{doi}" if doi else None,
+                "cited_by": {"value": cites_all_time},
+                "source": "Web of Science"
+            })
+            uids.append(ut or None)
+
+            # Citações por ano direto nos vetores pré-alocados
+            sparse = []
+            for slot, (col, year) in enumerate(year_cols):
+                if col >= n_cols:
+                    break
+                val = row[col]
+                if not val or val == "0":
+                    continue
+                try:
+                    c_val = int(val)
+                except ValueError:
+                    continue
+                if c_val > 0:
+                    citation_totals[slot] += c_val
+                    sparse.append((year, c_val))
+
+            year_citations.append(sparse)
+
+    return {
+        "articles": articles,
+        "uids": uids,
+        "year_citations": year_citations,
+        "years": years,
+        "citation_totals": citation_totals
+    }
+
+
+def _parse_wos_exports(files):
+    """
+    Faz o parse de vários exports em paralelo (um processo por arquivo).
+    Retorna [(arquivo, resultado)] na ordem de 'files'; arquivos com erro
+    são registrados no log e ignorados.
+    """
+    results = {}
+
+    if len(files) > 1 and WOS_PARSE_WORKERS > 1:
+        # multiprocessing só é importado quando há vários exports
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            with ProcessPoolExecutor(max_workers=min(WOS_PARSE_WORKERS, len(files))) as pool:
+                futures = {pool.submit(parse_wos_export, path): path for path in files}
+                for future in as_completed(futures):
+                    path = futures[future]
+                    try:
+                        results[path] = future.result()
+                    except Exception as e:
+                        logging.error(f"Erro ao ler {path}: {e}")
+            return [(path, results[path]) for path in files if path in results]
+
+        except (OSError, BrokenProcessPool) as e:
+            logging.warning(f"    [WoS] Pool de processos indisponível ({e}). Lendo em sequência.")
+            results = {}
+
+    for path in files:
+        try:
+            results[path] = parse_wos_export(path)
+        except Exception as e:
+            logging.error(f"Erro ao ler {path}: {e}")
+
+    return [(path, results[path]) for path in files if path in results]
 
-    # ==========================================================================
-    # 4. MONTAGEM DO GRÁFICO
-    # ==========================================================================
-    graph_data = []
-    # Une os anos onde houve publicações OU citações
-    all_years = sorted(set(yearly_citation_totals.keys()) | set(yearly_pub_counts.keys()))
-    current_year = datetime.now().year
+
+def merge_wos_exports(parsed_files):
+    """
+    Une os resultados de vários exports, descartando registros repetidos
+    entre arquivos (mesmo UT ou mesmo DOI) e somando as citações por ano
+    apenas dos registros mantidos.
+    """
+    articles = []
+    year_citations = []
+    yearly_citation_totals = {}
+    seen = set()
+    duplicates = 0
+
+    for _, parsed in parsed_files:
+        for y, total in zip(parsed["years"], parsed["citation_totals"]):
+            if total > 0:
+                yearly_citation_totals[y] = yearly_citation_totals.get(y, 0) + total
+
+        for art, ut, sparse in zip(parsed["articles"], parsed["uids"], parsed["year_citations"]):
+            record_keys = set()
+            if ut:
+                record_keys.add(f"ut:{ut.lower()}")
+            if art["doi"]:
+                record_keys.add(f"doi:{art['doi'].lower().strip()}")
+
+            if record_keys & seen:
+                # Repetido: desconta do total por ano o que o arquivo somou
+                duplicates += 1
+                for y, c_val in sparse:
+                    yearly_citation_totals[y] -= c_val
+                continue
+
+            seen |= record_keys
+            articles.append(art)
+            year_citations.append(sparse)
+
+    return {
+        "articles": articles,
+        "year_citations": year_citations,
+        "yearly_citation_totals": {y: t for y, t in yearly_citation_totals.items() if t > 0},
+        "duplicates": duplicates
+    }
+
+
+def _file_sha256(path, chunk_size=1 << 20) -> str:
+    """Hash SHA-256 do conteúdo de um arquivo, lido em blocos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def wos_cache_key(files) -> str:
+    """
+    Chave do cache do WoS: hash do conteúdo de cada export + versão do
+    parser + janelas das métricas + ano corrente (filtro do gráfico). Nome/mtime
+    dos arquivos não entram, então um checkout novo do mesmo export
+    continua acertando o cache.
+    """
+    digest = hashlib.sha256(
+        f"v{WOS_PARSER_VERSION}|{','.join(METRIC_WINDOWS)}|{datetime.now().year}".encode()
+    )
+    for file_hash in sorted(_file_sha256(path) for path in files):
+        digest.update(file_hash.encode())
+    return digest.hexdigest()
+
+
+def fetch_wos_data(researcher_id, api_key, sources=None):
+    """
+    Processa dados do Web of Science a partir de exports locais do WoS
+    (por padrão 'savedrecs*.txt'; ver WOS_EXPORT_PATHS / 'sources').
+    Vários arquivos são lidos em paralelo e os registros repetidos entre
+    exports são descartados por UT ou DOI.
+    A API foi removida temporariamente.
+    """
+    files = resolve_wos_export_files(sources)
+
+    # Se nenhum arquivo existir, retorna imediatamente
+    if not files:
+        logging.warning(f"Nenhum export do WoS encontrado em {sources or WOS_EXPORT_PATHS}. WoS será ignorado.")
+        return None
+
+    logging.info(f"--- Iniciando módulo Web of Science (Local) ---")
+
+    # Exports inalterados: devolve o resultado já processado
+    try:
+        cache_key = wos_cache_key(files)
+    except OSError as e:
+        logging.warning(f"    [WoS] Não foi possível calcular o hash dos exports: {e}")
+        cache_key = None
+
+    cache = load_json_data(WOS_CACHE_FILE, quiet=True) or {}
+    if cache_key and cache.get("key") == cache_key and cache.get("result"):
+        logging.info(f"✓ WoS Local: {len(files)} arquivo(s) inalterado(s). Usando resultado em cache.")
+        return cache["result"]
+
+    logging.info(f"Lendo {len(files)} arquivo(s): {', '.join(files)}")
+
+    parsed_files = _parse_wos_exports(files)
+    if not parsed_files:
+        return None
+
+    merged = merge_wos_exports(parsed_files)
+    articles = merged["articles"]
+    logging.info(
+        f"✓ WoS Local: {len(articles)} artigos processados"
+        f" ({merged['duplicates']} repetidos descartados)."
+    )
+
+    # Acumuladores Globais para o Gráfico
+    yearly_citation_totals = merged["yearly_citation_totals"]
+    yearly_pub_counts = {}
+    for art in articles:
+        year_str = art["year"]
+        if year_str and year_str.isdigit():
+            y_int = int(year_str)
+            yearly_pub_counts[y_int] = yearly_pub_counts.get(y_int, 0) + 1
+
+    if not articles:
+        return None
+
+    # ==========================================================================
+    # 3. CÁLCULO DE MÉTRICAS (TODAS AS JANELAS)
+    # ==========================================================================
+    citation_matrix, matrix_years = sparse_citation_matrix(merged["year_citations"])
+
+    metrics = compute_metrics(
+        [a["cited_by"]["value"] for a in articles],
+        pub_years=publication_years(articles),
+        yearly_matrix=citation_matrix,
+        matrix_years=matrix_years
+    )
+
+    # ==========================================================================
+    # 4. MONTAGEM DO GRÁFICO
+    # ==========================================================================
+    graph_data = []
+    # Une os anos onde houve publicações OU citações
+    all_years = sorted(set(yearly_citation_totals.keys()) | set(yearly_pub_counts.keys()))
+    current_year = datetime.now().year
 
     for y in all_years:
         # Filtro de sanidade visual (ex: 1990 até ano que vem)
@@ -1013,7 +2616,10 @@ def fetch_wos_data(researcher_id, api_key):
                     "publications": p_count
                 })
 
-    return {
+    # Evolução anual do h-index e do i10 (citações acumuladas por artigo)
+    add_metric_series(graph_data, citation_metric_series(citation_matrix, matrix_years))
+
+    result = {
         "profile": {
             "source_name": "Web of Science",
             "total_publications": len(articles),
@@ -1025,23 +2631,629 @@ def fetch_wos_data(researcher_id, api_key):
         "articles": articles
     }
 
+    if cache_key:
+        save_json_data(WOS_CACHE_FILE, {"key": cache_key, "result": result})
+
+    return result
+
+# ==============================================================================
+# REGISTRO CANÔNICO DE PUBLICAÇÕES (SQLite, IDs ESTÁVEIS)
+# ==============================================================================
+def article_aliases(article: dict) -> list:
+    """
+    Aliases conhecidos de um artigo, em ordem de confiança:
+    DOI, Scopus ID e título normalizado + ano.
+    """
+    aliases = []
+    doi = normalize_doi(article.get("doi"))
+    if doi:
+        aliases.append(("doi", doi))
+    if article.get("scopus_id"):
+        aliases.append(("scopus", str(article["scopus_id"]).strip()))
+    title = normalize_title(article.get("title"))
+    if title:
+        aliases.append(("title", f"{title}|{get_year_safe(article.get('year')) or ''}"))
+    return aliases
+
+
+class ArticleRegistry:
+    """
+    Registro local (SQLite) que dá a cada publicação um ID estável e guarda
+    todos os aliases já vistos (DOIs, Scopus IDs, títulos normalizados).
+
+    Um artigo é identificado por consulta indexada aos seus aliases; um
+    DOI que aparece depois é apenas mais um alias do mesmo ID. Se aliases
+    de um artigo apontam para IDs diferentes, os registros são unidos no
+    ID mais antigo, exceto os que já têm outro DOI (preprint e versão
+    publicada com o mesmo título continuam separados).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or REGISTRY_DB_FILE
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS publications (
+                id          INTEGER PRIMARY KEY,
+                title       TEXT,
+                year        TEXT,
+                first_seen  TEXT NOT NULL,
+                last_seen   TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS aliases (
+                kind    TEXT NOT NULL,
+                value   TEXT NOT NULL,
+                pub_id  INTEGER NOT NULL REFERENCES publications(id),
+                PRIMARY KEY (kind, value)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_aliases_pub ON aliases(pub_id);
+        """)
+        self._now = datetime.now().isoformat(timespec="seconds")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.conn:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def _alias_ids(self, aliases) -> set:
+        """
+        IDs apontados pelos aliases (na ordem de confiança), sem os que têm
+        um DOI diferente do artigo ou dos IDs já aceitos.
+        """
+        ids, dois = [], {value for kind, value in aliases if kind == "doi"}
+        for kind, value in aliases:
+            row = self.conn.execute(
+                "SELECT pub_id FROM aliases WHERE kind = ? AND value = ?", (kind, value)
+            ).fetchone()
+            if not row or row[0] in ids:
+                continue
+            pub_dois = {doi for doi, in self.conn.execute(
+                "SELECT value FROM aliases WHERE pub_id = ? AND kind = 'doi'", (row[0],))}
+            if dois and pub_dois and not dois & pub_dois:
+                continue
+            ids.append(row[0])
+            dois |= pub_dois
+        return set(ids)
+
+    def lookup(self, aliases):
+        """ID já registrado para algum dos aliases (o mais antigo), ou None."""
+        ids = self._alias_ids(aliases)
+        return min(ids) if ids else None
+
+    def _fold(self, other: int, pub_id: int):
+        """
+        Une o registro 'other' em 'pub_id': aliases e eventos do histórico
+        (CitationHistory) passam para 'pub_id'. Eventos dos dois IDs na
+        mesma execução e fonte ficam com a maior contagem.
+        """
+        self.conn.execute("UPDATE aliases SET pub_id = ? WHERE pub_id = ?", (pub_id, other))
+        has_history = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'citation_events'"
+        ).fetchone()
+        if has_history:
+            self.conn.execute("""
+                INSERT INTO citation_events (pub_id, source, run_id, citations)
+                SELECT ?, source, run_id, citations FROM citation_events WHERE pub_id = ? AND 1
+                ON CONFLICT (pub_id, source, run_id) DO UPDATE SET citations = MAX(
+                    COALESCE(citations, excluded.citations), COALESCE(excluded.citations, citations))
+            """, (pub_id, other))
+            self.conn.execute("DELETE FROM citation_events WHERE pub_id = ?", (other,))
+        self.conn.execute("DELETE FROM publications WHERE id = ?", (other,))
+
+    def resolve(self, aliases, title=None, year=None) -> int:
+        """
+        Devolve o ID estável da publicação descrita pelos aliases, criando
+        o registro se nenhum alias for conhecido e gravando os aliases novos.
+        """
+        ids = self._alias_ids(aliases)
+        if ids:
+            pub_id = min(ids)
+            for other in ids - {pub_id}:
+                # Aliases de registros distintos se mostraram a mesma publicação
+                self._fold(other, pub_id)
+            self.conn.execute(
+                "UPDATE publications SET last_seen = ?, title = COALESCE(?, title), year = COALESCE(?, year) "
+                "WHERE id = ?", (self._now, title, year, pub_id)
+            )
+        else:
+            pub_id = self.conn.execute(
+                "INSERT INTO publications (title, year, first_seen, last_seen) VALUES (?, ?, ?, ?)",
+                (title, year, self._now, self._now)
+            ).lastrowid
+
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO aliases (kind, value, pub_id) VALUES (?, ?, ?)",
+            [(kind, value, pub_id) for kind, value in aliases]
+        )
+        return pub_id
+
+    def resolve_article(self, article: dict) -> int:
+        """Atalho de resolve() para um artigo no formato do frontend."""
+        return self.resolve(article_aliases(article), article.get("title"), str(article.get("year") or "") or None)
+
+    def commit(self):
+        self.conn.commit()
+
+# ==============================================================================
+# HISTÓRICO DE CITAÇÕES (APPEND-ONLY, NO MESMO BANCO DO REGISTRO)
+# ==============================================================================
+# Fontes com citações por artigo e tabela de métricas
+HISTORY_SOURCES = ("google_scholar", "scopus", "web_of_science")
+
+
+class CitationHistory:
+    """
+    Histórico append-only das citações por artigo e das métricas por fonte.
+
+    Cada execução vira uma linha em 'runs'; as tabelas de eventos só recebem
+    os valores que MUDARAM desde o último registrado (codificação por
+    delta: um artigo estável não gera linha nenhuma). O estado em qualquer
+    execução é o último evento de cada chave até ela. Artigos que somem de
+    uma fonte ganham um evento com valor NULL.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.conn = registry.conn
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id          INTEGER PRIMARY KEY,
+                started_at  TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS citation_events (
+                pub_id     INTEGER NOT NULL,
+                source     TEXT NOT NULL,
+                run_id     INTEGER NOT NULL REFERENCES runs(id),
+                citations  INTEGER,
+                PRIMARY KEY (pub_id, source, run_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS metric_events (
+                source   TEXT NOT NULL,
+                metric   TEXT NOT NULL,
+                window   TEXT NOT NULL,
+                run_id   INTEGER NOT NULL REFERENCES runs(id),
+                value    REAL,
+                PRIMARY KEY (source, metric, window, run_id)
+            ) WITHOUT ROWID;
+        """)
+
+    # --- Escrita ---------------------------------------------------------------
+    def record_run(self, academic_data: dict, started_at=None) -> int:
+        """
+        Registra uma execução. Fontes ausentes (None/falha) não são tocadas,
+        para não virarem remoções. Retorna o ID da execução.
+        """
+        started_at = started_at or datetime.now().isoformat(timespec="seconds")
+        run_id = self.conn.execute("INSERT INTO runs (started_at) VALUES (?)", (started_at,)).lastrowid
+
+        sources = {
+            source: [art for art in (academic_data.get(source) or {}).get("articles") or []
+                     if normalize_title(art.get("title"))]
+            for source in HISTORY_SOURCES if academic_data.get(source)
+        }
+        # Primeiro resolve tudo: uniões de IDs feitas pelo registro nesta
+        # execução já levam os eventos antigos junto (ArticleRegistry._fold)
+        for articles in sources.values():
+            for art in articles:
+                self.registry.resolve_article(art)
+        last_citations, last_metrics = self._state(None)
+
+        citation_rows, metric_rows = [], []
+        for source, articles in sources.items():
+            data = academic_data[source]
+            current = {}
+            for art in articles:
+                pub_id = self.registry.resolve_article(art)
+                value = int((art.get("cited_by") or {}).get("value") or 0)
+                current[pub_id] = max(current.get(pub_id, 0), value)
+
+            for pub_id, value in current.items():
+                if last_citations.get((pub_id, source)) != value:
+                    citation_rows.append((pub_id, source, run_id, value))
+            for (pub_id, src), value in last_citations.items():
+                if src == source and value is not None and pub_id not in current:
+                    citation_rows.append((pub_id, source, run_id, None))
+
+            table = ((data.get("profile") or data).get("cited_by") or {}).get("table") or []
+            for row in table:
+                for metric, values in row.items():
+                    for window, value in (values or {}).items():
+                        if last_metrics.get((source, metric, window)) != value:
+                            metric_rows.append((source, metric, window, run_id, value))
+
+        self.conn.executemany("INSERT INTO citation_events VALUES (?, ?, ?, ?)", citation_rows)
+        self.conn.executemany("INSERT INTO metric_events VALUES (?, ?, ?, ?, ?)", metric_rows)
+        self.conn.commit()
+        logging.info(
+            f"    [Histórico] Execução #{run_id}: {len(citation_rows)} citações e "
+            f"{len(metric_rows)} métricas alteradas gravadas."
+        )
+        return run_id
+
+    # --- Consultas -------------------------------------------------------------
+    def _state(self, run_id):
+        """
+        Estado reconstruído até a execução 'run_id' (None = última):
+        ({(pub_id, fonte): citações}, {(fonte, métrica, janela): valor}).
+        """
+        limit = run_id if run_id is not None else self.conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM runs").fetchone()[0]
+        # SQLite devolve as colunas da linha do MAX() em agregações simples
+        citations = {
+            (pub_id, source): value for pub_id, source, value, _ in self.conn.execute(
+                "SELECT pub_id, source, citations, MAX(run_id) FROM citation_events "
+                "WHERE run_id <= ? GROUP BY pub_id, source", (limit,))
+        }
+        metrics = {
+            (source, metric, window): value for source, metric, window, value, _ in self.conn.execute(
+                "SELECT source, metric, window, value, MAX(run_id) FROM metric_events "
+                "WHERE run_id <= ? GROUP BY source, metric, window", (limit,))
+        }
+        return citations, metrics
+
+    def runs(self) -> list:
+        """Lista [(run_id, data/hora)] das execuções registradas."""
+        return self.conn.execute("SELECT id, started_at FROM runs ORDER BY id").fetchall()
+
+    def run_at(self, when):
+        """Última execução até a data/hora 'when' (str ISO ou datetime), ou None."""
+        if isinstance(when, datetime):
+            when = when.isoformat(timespec="seconds")
+        row = self.conn.execute(
+            "SELECT MAX(id) FROM runs WHERE started_at <= ?", (str(when),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def article_history(self, article, source=None) -> list:
+        """
+        Citações de um artigo ao longo do tempo: [(data/hora, fonte, citações)].
+        'article' pode ser o ID estável ou um artigo (dict) resolvido pelo registro.
+        """
+        pub_id = article if isinstance(article, int) else self.registry.lookup(article_aliases(article))
+        if pub_id is None:
+            return []
+        query = (
+            "SELECT r.started_at, e.source, e.citations FROM citation_events e "
+            "JOIN runs r ON r.id = e.run_id WHERE e.pub_id = ?"
+        )
+        params = [pub_id]
+        if source:
+            query += " AND e.source = ?"
+            params.append(source)
+        return self.conn.execute(query + " ORDER BY e.run_id, e.source", params).fetchall()
+
+    def metrics_as_of(self, when) -> dict:
+        """Métricas de cada fonte na data 'when': {fonte: {métrica: {janela: valor}}}."""
+        run_id = self.run_at(when)
+        if run_id is None:
+            return {}
+        result = {}
+        for (source, metric, window), value in self._state(run_id)[1].items():
+            result.setdefault(source, {}).setdefault(metric, {})[window] = value
+        return result
+
+    def diff_runs(self, run_a, run_b) -> dict:
+        """
+        Diferenças entre duas execuções:
+        {"citations": [(pub_id, fonte, antes, depois)], "metrics": [(fonte, métrica, janela, antes, depois)]}.
+        """
+        cit_a, met_a = self._state(run_a)
+        cit_b, met_b = self._state(run_b)
+        changed_citations = [
+            (pub_id, source, cit_a.get((pub_id, source)), cit_b.get((pub_id, source)))
+            for pub_id, source in set(cit_a) | set(cit_b)
+            if cit_a.get((pub_id, source)) != cit_b.get((pub_id, source))
+        ]
+        changed_metrics = [
+            (*key, met_a.get(key), met_b.get(key))
+            for key in set(met_a) | set(met_b)
+            if met_a.get(key) != met_b.get(key)
+        ]
+        return {
+            "citations": sorted(changed_citations, key=lambda row: row[:2]),
+            "metrics": sorted(changed_metrics, key=lambda row: row[:3])
+        }
+
+# ==============================================================================
+# MERGE ENTRE FONTES (LISTA CANÔNICA DE PUBLICAÇÕES)
+# ==============================================================================
+# Fontes do merge, em ordem de preferência para os metadados canônicos
+# (título, periódico, link): as bases curadas vêm antes do Scholar.
+MERGE_SOURCES = ("scopus", "web_of_science", "orcid", "google_scholar")
+
+MERGE_SHINGLE_SIZE = 4          # shingles de caracteres do título normalizado
+MERGE_MINHASH_BANDS = 8         # LSH: 8 bandas x 4 linhas = 32 permutações
+MERGE_MINHASH_ROWS = 4
+MERGE_TITLE_SIMILARITY = 0.8    # Jaccard mínimo dos shingles para unir títulos
+MERGE_YEAR_TOLERANCE = 1        # preprint/online-first vs. ano da edição
+
+_MINHASH_PRIME = 4294967311     # primo > 2^32 (hashes crc32 cabem abaixo dele)
+_MINHASH_SEED = 20240501
+_minhash_params = None
+
+
+def _minhash_coefficients():
+    """Coeficientes (a, b) das permutações, gerados uma vez (semente fixa)."""
+    global _minhash_params
+    if _minhash_params is None:
+        rng = np.random.default_rng(_MINHASH_SEED)
+        size = MERGE_MINHASH_BANDS * MERGE_MINHASH_ROWS
+        _minhash_params = (
+            rng.integers(1, 1 << 31, size, dtype=np.uint64),
+            rng.integers(0, 1 << 31, size, dtype=np.uint64)
+        )
+    return _minhash_params
+
+
+def normalize_doi(doi) -> str:
+    """DOI em minúsculas, sem prefixo de URL/'doi:' e sem espaços."""
+    if not doi:
+        return ""
+    doi = str(doi).strip().lower()
+    doi = re.sub(r"^(https?://(dx\.)?doi\.org/|doi:\s*)", "", doi)
+    return doi.strip()
+
+
+def title_shingles(norm_title: str) -> set:
+    """Conjunto de shingles de caracteres (sem espaços) do título normalizado."""
+    compact = norm_title.replace(" ", "")
+    if len(compact) <= MERGE_SHINGLE_SIZE:
+        return {compact} if compact else set()
+    return {compact[i:i + MERGE_SHINGLE_SIZE] for i in range(len(compact) - MERGE_SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(shingles: set):
+    """Assinatura MinHash (uma posição por permutação h(x) = a·x + b mod p)."""
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles)
+    )
+    a, b = _minhash_coefficients()
+    return ((np.outer(a, hashes) + b[:, None]) % _MINHASH_PRIME).min(axis=1)
+
+
+def _merge_years_compatible(y1: int, y2: int) -> bool:
+    return not y1 or not y2 or abs(y1 - y2) <= MERGE_YEAR_TOLERANCE
+
+
+def _canonical_publication(records) -> dict:
+    """Registro canônico de um grupo de registros equivalentes."""
+    records = sorted(records, key=lambda r: MERGE_SOURCES.index(r["source_key"]))
+    best = records[0]["article"]
+
+    def first(field):
+        return next((r["article"].get(field) for r in records
+                     if r["article"].get(field) not in (None, "", "N/A")), None)
+
+    citations = {}
+    for r in records:
+        value = (r["article"].get("cited_by") or {}).get("value")
+        if value is not None:
+            citations[r["source_key"]] = max(citations.get(r["source_key"], 0), int(value or 0))
+
+    doi = next((r["doi"] for r in records if r["doi"]), "")
+    years = [r["year"] for r in records if r["year"]]
+
+    publication = {
+        "title": best.get("title"),
+        "year": str(min(years)) if years else "",
+        "journalTitle": first("journalTitle") or "N/A",
+        "doi": doi or None,
+        "link": first("link") or (f"https://doi.org/{doi}" if doi else None),
+        "doiLink": f"https://doi.org/{doi}" if doi else None,
+        "cited_by": {"value": max(citations.values(), default=0)},
+        "citations": citations,
+        "sources": list(dict.fromkeys(r["source_key"] for r in records))
+    }
+    scopus_id = first("scopus_id")
+    if scopus_id:
+        publication["scopus_id"] = scopus_id
+    return publication
+
+
+def merge_publications(academic_data: dict, registry=None) -> list:
+    """
+    Une os artigos de todas as fontes em uma lista canônica.
+
+    Os pares candidatos vêm de um índice de blocagem (DOI, título
+    normalizado e bandas LSH de MinHash dos shingles do título), então só
+    registros que compartilham algum bloco são comparados. Títulos
+    parecidos só são unidos com Jaccard >= MERGE_TITLE_SIMILARITY, anos
+    compatíveis e sem DOIs conflitantes. Cada publicação traz as citações
+    por fonte ('citations'), a maior delas em 'cited_by' e a proveniência
+    ('sources').
+
+    Com um ArticleRegistry, registros que o registro já conhece como a mesma
+    publicação também são unidos, e cada publicação recebe seu ID estável
+    ('id').
+    """
+    records = []
+    for source_key in MERGE_SOURCES:
+        source = academic_data.get(source_key) or {}
+        for art in source.get("articles") or []:
+            norm = normalize_title(art.get("title"))
+            if not norm:
+                continue
+            records.append({
+                "source_key": source_key,
+                "article": art,
+                "title": norm,
+                "doi": normalize_doi(art.get("doi")),
+                "year": get_year_safe(art.get("year"))
+            })
+
+    if not records:
+        return []
+
+    # Union-find sobre os índices dos registros
+    parent = list(range(len(records)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # DOI de cada grupo (na raiz): grupos com DOIs diferentes nunca se unem,
+    # nem por meio de um registro sem DOI (ex.: preprint e versão publicada)
+    group_doi = [rec["doi"] for rec in records]
+
+    def union(i, j):
+        ri, rj = find(i), find(j)
+        if ri == rj or (group_doi[ri] and group_doi[rj] and group_doi[ri] != group_doi[rj]):
+            return
+        root, child = min(ri, rj), max(ri, rj)
+        parent[child] = root
+        group_doi[root] = group_doi[root] or group_doi[child]
+
+    # 1. Blocos exatos: DOI e título normalizado
+    by_doi, by_title = {}, {}
+    for i, rec in enumerate(records):
+        if rec["doi"]:
+            by_doi.setdefault(rec["doi"], []).append(i)
+        by_title.setdefault(rec["title"], []).append(i)
+
+    for members in by_doi.values():
+        for j in members[1:]:
+            union(members[0], j)
+
+    for members in by_title.values():
+        for a_pos, i in enumerate(members):
+            for j in members[a_pos + 1:]:
+                if _merge_years_compatible(records[i]["year"], records[j]["year"]):
+                    union(i, j)
+
+    # 2. Blocos aproximados: bandas LSH das assinaturas MinHash. Um
+    #    representante por título e grupo basta (os demais já foram unidos).
+    representatives = list({(rec["title"], find(i)): i for i, rec in enumerate(records)}.values())
+    shingles = {i: title_shingles(records[i]["title"]) for i in representatives}
+    buckets = {}
+    for i in representatives:
+        signature = minhash_signature(shingles[i])
+        for band in range(MERGE_MINHASH_BANDS):
+            rows = signature[band * MERGE_MINHASH_ROWS:(band + 1) * MERGE_MINHASH_ROWS]
+            buckets.setdefault((band, rows.tobytes()), []).append(i)
+
+    checked = set()
+    for members in buckets.values():
+        for a_pos, i in enumerate(members):
+            for j in members[a_pos + 1:]:
+                if (i, j) in checked or find(i) == find(j):
+                    continue
+                checked.add((i, j))
+                a, b = shingles[i], shingles[j]
+                similarity = len(a & b) / len(a | b) if a or b else 0
+                if (similarity >= MERGE_TITLE_SIMILARITY
+                        and _merge_years_compatible(records[i]["year"], records[j]["year"])):
+                    union(i, j)
+
+    # 3. Equivalências já conhecidas pelo registro (aliases de execuções anteriores)
+    if registry is not None:
+        by_registry_id = {}
+        for i, rec in enumerate(records):
+            pub_id = registry.lookup(article_aliases(rec["article"]))
+            if pub_id is not None:
+                by_registry_id.setdefault(pub_id, []).append(i)
+        for members in by_registry_id.values():
+            for j in members[1:]:
+                union(members[0], j)
+
+    # 4. Um registro canônico por grupo
+    groups = {}
+    for i in range(len(records)):
+        groups.setdefault(find(i), []).append(records[i])
+
+    publications = []
+    for group in groups.values():
+        publication = _canonical_publication(group)
+        if registry is not None:
+            aliases = list(dict.fromkeys(
+                alias for rec in group for alias in article_aliases(rec["article"])
+            ))
+            publication = {"id": registry.resolve(aliases, publication["title"], publication["year"] or None),
+                           **publication}
+        publications.append(publication)
+    if registry is not None:
+        registry.commit()
+    publications.sort(key=lambda p: (p["cited_by"]["value"], p["year"]), reverse=True)
+
+    logging.info(
+        f"✓ Merge: {len(records)} registros de {len({r['source_key'] for r in records})} fonte(s) -> "
+        f"{len(publications)} publicações únicas."
+    )
+    return publications
+
 # ==============================================================================
 # FUNÇÃO DE COMPARAÇÃO E GERAÇÃO DE RELATÓRIO (COM MATCHING DE ARTIGOS)
 # ==============================================================================
-def analyze_changes(old_data, new_data):
+# Campos comparados no delta
+ARTICLE_DIFF_FIELDS = ("title", "year", "doi", "journalTitle", "link", "cited_by")
+REPO_DIFF_FIELDS = ("html_url", "homepage", "description", "language",
+                    "stargazers_count", "forks_count", "updated_at", "topics")
+
+# Fontes comparadas: (chave em academicData, rótulo do relatório)
+DIFF_SOURCES = (
+    ("google_scholar", "Scholar"),
+    ("scopus", "Scopus"),
+    ("web_of_science", "WoS"),
+    ("orcid", "ORCID")
+)
+
+
+def _metric_values(source_data) -> dict:
+    """Tabela de métricas de uma fonte achatada em {"métrica.janela": valor}."""
+    source_data = source_data or {}
+    table = ((source_data.get("profile") or source_data).get("cited_by") or {}).get("table") or []
+    return {
+        f"{metric}.{window}": value
+        for row in table for metric, values in row.items() for window, value in (values or {}).items()
+    }
+
+
+def delta_has_changes(delta) -> bool:
+    """True se o delta de analyze_changes pede a regravação do arquivo."""
+    return bool(delta.get("initial") or delta.get("githubRepos") or delta.get("academicData"))
+
+
+def analyze_changes(old_data, new_data, registry=None):
     """
-    Compara dados antigos e novos e gera relatório textual detalhado.
-    Usa normalize_title para encontrar correspondências de artigos.
+    Compara dados antigos e novos em uma única passada pelos mapas chaveados
+    e devolve (relatório textual, delta estruturado).
+
+    O delta cobre repositórios do GitHub e todas as fontes acadêmicas
+    (inclusive ORCID): itens adicionados, removidos, campos alterados
+    (citações para cima ou para baixo e metadados) e métricas alteradas.
+    Seções sem mudança são omitidas, então um delta sem 'githubRepos' nem
+    'academicData' significa "nada mudou".
+
+    Com um ArticleRegistry, os artigos são casados pelo ID estável do
+    registro; sem ele, por DOI ou normalize_title + ano.
     """
 
     if old_data is None:
-        return (["  [!] Arquivo de dados antigo não encontrado (Primeira execução)."], ["initial_generation"])
+        return (["  [!] Arquivo de dados antigo não encontrado (Primeira execução)."], {"initial": True})
 
     report_lines = []
-    modification_notes = []
+    delta = {"from": old_data.get("lastUpdated"), "to": new_data.get("lastUpdated")}
 
     # --- Helper para chaves de artigos ---
-    def get_art_key(a):
+    def get_art_key(a, old=False):
+        # ID estável do registro (consulta indexada pelos aliases). O lado
+        # antigo só consulta: nada do documento anterior é gravado no registro.
+        if registry is not None:
+            if not old:
+                return f"id:{registry.resolve_article(a)}"
+            pub_id = registry.lookup(article_aliases(a))
+            if pub_id is not None:
+                return f"id:{pub_id}"
         # Prioridade absoluta para DOI
         if a.get("doi"):
             return f"doi:{str(a['doi']).lower().strip()}"
@@ -1059,70 +3271,113 @@ def analyze_changes(old_data, new_data):
         except (ValueError, TypeError):
             return 0
 
-    # 1. Comparação do GitHub
-    old_repos = {r.get("name") for r in old_data.get("githubRepos", []) if r.get("name")}
-    new_repos = {r.get("name") for r in new_data.get("githubRepos", []) if r.get("name")}
-    added_repos = new_repos - old_repos
-    if added_repos:
-        report_lines.append(f"  [+] GitHub: {len(added_repos)} repositórios adicionados.")
+    def diff_maps(old_map, new_map, fields, normalize=None):
+        """Uma passada pela união das chaves: (adicionados, removidos, alterados)."""
+        added, removed, changed = [], [], {}
+        for key in old_map.keys() | new_map.keys():
+            old_item, new_item = old_map.get(key), new_map.get(key)
+            if old_item is None:
+                added.append(key)
+            elif new_item is None:
+                removed.append(key)
+            else:
+                fields_changed = {}
+                for field in fields:
+                    a, b = old_item.get(field), new_item.get(field)
+                    if normalize:
+                        a, b = normalize(field, a), normalize(field, b)
+                    if a != b:
+                        fields_changed[field] = [a, b]
+                if fields_changed:
+                    changed[key] = fields_changed
+        return sorted(added), sorted(removed), changed
+
+    # 1. Comparação do GitHub (por nome do repositório)
+    old_repos = {r.get("name"): r for r in old_data.get("githubRepos", []) or [] if r.get("name")}
+    new_repos = {r.get("name"): r for r in new_data.get("githubRepos", []) or [] if r.get("name")}
+    added, removed, changed = diff_maps(old_repos, new_repos, REPO_DIFF_FIELDS)
+
+    repo_delta = {}
+    if added:
+        repo_delta["added"] = [new_repos[name] for name in added]
+        report_lines.append(f"  [+] GitHub: {len(added)} repositórios adicionados.")
+    if removed:
+        repo_delta["removed"] = removed
+        report_lines.append(f"  [-] GitHub: {len(removed)} repositórios removidos.")
+    if changed:
+        repo_delta["changed"] = changed
+        report_lines.append(f"  [*] GitHub: {len(changed)} repositórios com campos alterados.")
+    if repo_delta:
+        delta["githubRepos"] = repo_delta
 
     # 2. Comparação Detalhada por Fonte Acadêmica
-    # Vamos olhar dentro de cada fonte para ver novos artigos ou mudanças de citação
-    sources_to_check = [
-        ("google_scholar", "Scholar"),
-        ("scopus", "Scopus"),
-        ("web_of_science", "WoS")
-    ]
+    def normalize_article_field(field, value):
+        return force_int(value) if field == "cited_by" else value
+
+    old_acad = old_data.get("academicData", {}) or {}
+    new_acad = new_data.get("academicData", {}) or {}
+    academic_delta = {}
 
-    for source_key, label in sources_to_check:
+    for source_key, label in DIFF_SOURCES:
         # Pega as listas de artigos antiga e nova
-        old_list = old_data.get("academicData", {}).get(source_key, {}).get("articles", [])
-        new_list = new_data.get("academicData", {}).get(source_key, {}).get("articles", [])
+        old_list = (old_acad.get(source_key) or {}).get("articles", []) or []
+        new_list = (new_acad.get(source_key) or {}).get("articles", []) or []
 
         # Se for fallback do Scholar antigo
         if not old_list and source_key == "google_scholar":
             old_list = old_data.get("scholarData", {}).get("articles", [])
 
-        if not new_list and not old_list:
-            continue
+        source_delta = {}
+
+        if new_list or old_list:
+            # Cria mapas {chave: artigo} para comparação rápida
+            new_map = {get_art_key(a): a for a in new_list}
+            old_map = {get_art_key(a, old=True): a for a in old_list}
+            added, removed, changed = diff_maps(old_map, new_map, ARTICLE_DIFF_FIELDS, normalize_article_field)
+
+            if added:
+                source_delta["added"] = [new_map[k] for k in added]
+                report_lines.append(f"  [+] {label}: {len(added)} novos artigos encontrados.")
+                for k in added[:3]: # Mostra apenas os 3 primeiros
+                    title = new_map[k].get("title") or "Sem título"
+                    report_lines.append(f"      - {title[:60]}...")
+            if removed:
+                source_delta["removed"] = removed
+                report_lines.append(f"  [-] {label}: {len(removed)} artigos removidos.")
+            if changed:
+                source_delta["changed"] = changed
+                cites = [c["cited_by"] for c in changed.values() if "cited_by" in c]
+                up = [b - a for a, b in cites if b > a]
+                down = [a - b for a, b in cites if b < a]
+                metadata = sum(1 for c in changed.values() if set(c) - {"cited_by"})
+                if up:
+                    report_lines.append(f"  [*] {label}: {len(up)} artigos receberam novas citações (Total: +{sum(up)}).")
+                if down:
+                    report_lines.append(f"  [*] {label}: {len(down)} artigos perderam citações (Total: -{sum(down)}).")
+                if metadata:
+                    report_lines.append(f"  [*] {label}: {metadata} artigos com metadados alterados.")
+
+        old_metrics = _metric_values(old_acad.get(source_key))
+        new_metrics = _metric_values(new_acad.get(source_key))
+        metric_changes = {
+            k: [old_metrics.get(k), new_metrics.get(k)]
+            for k in old_metrics.keys() | new_metrics.keys()
+            if old_metrics.get(k) != new_metrics.get(k)
+        }
+        if metric_changes:
+            source_delta["metrics"] = metric_changes
+            report_lines.append(f"  [*] {label}: {len(metric_changes)} métricas alteradas.")
 
-        # Cria mapas {chave: artigo} para comparação rápida
-        old_map = {get_art_key(a): a for a in old_list}
-        new_map = {get_art_key(a): a for a in new_list}
-
-        # Verifica artigos ADICIONADOS
-        added_keys = set(new_map.keys()) - set(old_map.keys())
-        if added_keys:
-            report_lines.append(f"  [+] {label}: {len(added_keys)} novos artigos encontrados.")
-            # Opcional: Listar os títulos dos novos
-            for k in list(added_keys)[:3]: # Mostra apenas os 3 primeiros
-                title = new_map[k].get("title", "Sem título")
-                report_lines.append(f"      - {title[:60]}...")
-
-        # Verifica MUDANÇA DE CITAÇÕES em artigos existentes
-        citation_changes = 0
-        citation_diff_total = 0
-        
-        for k, new_art in new_map.items():
-            if k in old_map:
-                old_art = old_map[k]
-                
-                # Normaliza a leitura das citações (pode ser int ou dict {'value': int})
-                c_new = force_int(new_art.get("cited_by"))
-                c_old = force_int(old_art.get("cited_by"))
-                
-                if c_new > c_old:
-                    citation_changes += 1
-                    diff = c_new - c_old
-                    citation_diff_total += diff
-                    
-                    # Se quiser muito detalhe, descomente a linha abaixo:
-                    # report_lines.append(f"      * {new_art.get('title')[:30]}...: {c_old} -> {c_new}")
-
-        if citation_changes > 0:
-            report_lines.append(f"  [*] {label}: {citation_changes} artigos receberam novas citações (Total: +{citation_diff_total}).")
-
-    return report_lines, modification_notes
+        if source_delta:
+            academic_delta[source_key] = source_delta
+
+    if academic_delta:
+        delta["academicData"] = academic_delta
+
+    if registry is not None:
+        registry.commit()
+
+    return report_lines, delta
 
 # ==============================================================================
 # FUNÇÕES DE GERAÇÃO E ATUALIZAÇÃO DE ARQUIVOS (MANTIDAS COMO PEDIDO)
@@ -1180,67 +3435,480 @@ def update_main_file(main_file, temp_file):
 
 
 # ==============================================================================
-# EXECUÇÃO PRINCIPAL (ATUALIZADA)
+# PACOTES DE DADOS FRAGMENTADOS (SHARDS) PARA O FRONTEND
 # ==============================================================================
-if __name__ == "__main__":
-    logging.info("\n" + "="*60)
-    logging.info(" INICIANDO SCRIPT DE ATUALIZAÇÃO ACADÊMICA")
-    logging.info("="*60)
+# Cada shard é um pedaço do documento completo (mesma estrutura do
+# fallback-data.json), minificado e com hash do conteúdo no nome; o
+# utils.js junta apenas os shards que a página usa, guiado pelo manifest.
+DATA_BUNDLE_DIR = "data"   # keys.json: 'data_bundle_dir'
+DATA_BUNDLE_MANIFEST = "manifest.json"
+DATA_BUNDLE_HASH_LENGTH = 12
 
-    # 1. Carregar dados antigos para comparação
-    logging.info(">>> 1. Carregando dados anteriores...")
-    old_data = load_json_data(MAIN_FILENAME)
-    
-    # Extrai o "cache" antigo do Scopus para caso de falha
-    old_scopus_data = old_data.get("academicData", {}).get("scopus")
-    if old_scopus_data:
-        logging.info(f"    [Cache] Scopus antigo encontrado ({len(old_scopus_data.get('articles', []))} artigos).")
+# Fontes com tabela de métricas/gráfico (shard 'metrics')
+BUNDLE_PROFILE_SOURCES = ("google_scholar", "scopus", "web_of_science", "maximized")
+
+
+def split_data_shards(data: dict) -> dict:
+    """
+    Divide o documento completo em shards {nome: documento parcial}:
+    'repos', 'metrics' (tabelas e gráficos, sem artigos), 'publications'
+    (lista canônica) e 'articles.<fonte>' (artigos de cada fonte).
+    """
+    academic = data.get("academicData") or {}
+    shards = {"repos": {"githubRepos": data.get("githubRepos") or []}}
+
+    metrics = {}
+    for source_key in BUNDLE_PROFILE_SOURCES:
+        source = academic.get(source_key)
+        if source:
+            metrics[source_key] = {k: v for k, v in source.items() if k != "articles"}
+    shards["metrics"] = {"lastUpdated": data.get("lastUpdated"), "academicData": metrics}
+
+    shards["publications"] = {"academicData": {"publications": academic.get("publications") or []}}
+
+    for source_key, source in academic.items():
+        if isinstance(source, dict) and source.get("articles"):
+            shards[f"articles.{source_key}"] = {"academicData": {source_key: {"articles": source["articles"]}}}
+
+    return shards
+
+
+def _write_bytes_atomic(path, payload: bytes):
+    temp_path = f"{path}.writing"
+    with open(temp_path, "wb") as f:
+        f.write(payload)
+    os.replace(temp_path, path)
+
+
+def write_data_bundles(data: dict, out_dir=None):
+    """
+    Grava os shards minificados em '<out_dir>/<nome>.<hash>.json', com
+    irmãos pré-comprimidos '.gz' (e '.br', se o pacote 'brotli' estiver
+    instalado), e o manifest '<out_dir>/manifest.json'.
+
+    Shards com o mesmo conteúdo mantêm o nome (e o cache do navegador).
+    Arquivos que não estão no manifest atual nem no anterior são removidos.
+    Retorna o manifest, ou None em caso de erro.
+    """
+    out_dir = out_dir or DATA_BUNDLE_DIR
+    brotli = _optional_import("brotli")
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+        manifest_path = os.path.join(out_dir, DATA_BUNDLE_MANIFEST)
+        previous = load_json_data(manifest_path, quiet=True) or {}
+
+        manifest = {"version": 1, "lastUpdated": data.get("lastUpdated"), "shards": {}}
+        keep = {DATA_BUNDLE_MANIFEST}
+
+        for name, shard in split_data_shards(data).items():
+            payload = json.dumps(shard, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            digest = hashlib.sha256(payload).hexdigest()[:DATA_BUNDLE_HASH_LENGTH]
+            filename = f"{name}.{digest}.json"
+            path = os.path.join(out_dir, filename)
+
+            variants = {"": payload, ".gz": gzip.compress(payload, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants[".br"] = brotli.compress(payload, quality=11)
+
+            for suffix, content in variants.items():
+                if not os.path.exists(path + suffix):
+                    _write_bytes_atomic(path + suffix, content)
+                keep.add(filename + suffix)
+
+            manifest["shards"][name] = {
+                "file": filename,
+                "bytes": len(payload),
+                "gzip": len(variants[".gz"]),
+                **({"br": len(variants[".br"])} if ".br" in variants else {})
+            }
+
+        # Mantém também os arquivos do manifest anterior (páginas já abertas)
+        for entry in (previous.get("shards") or {}).values():
+            for suffix in ("", ".gz", ".br"):
+                keep.add(entry.get("file", "") + suffix)
+        for existing in os.listdir(out_dir):
+            if existing not in keep and re.fullmatch(r"[\w.-]+\.[0-9a-f]+\.json(\.gz|\.br)?", existing):
+                os.remove(os.path.join(out_dir, existing))
+
+        if not save_json_data(manifest_path, manifest):
+            return None
+
+        total = sum(s["bytes"] for s in manifest["shards"].values())
+        logging.info(
+            f"✓ {len(manifest['shards'])} shards gravados em '{out_dir}/' "
+            f"({total / 1024:.0f} KiB minificados{', com .gz/.br' if brotli else ', com .gz'})."
+        )
+        return manifest
+
+    except OSError as e:
+        logging.error(f"Erro ao gravar os shards em '{out_dir}': {e}")
+        return None
+
+
+# ==============================================================================
+# CODIFICAÇÃO COLUNAR COMPACTA DAS LISTAS DE ARTIGOS (OPCIONAL)
+# ==============================================================================
+# Com 'compact_articles' no keys.json, cada lista de artigos sai como colunas
+# paralelas; o utils.js (e load_fallback_document) decodificam pelo 'schema'.
+COMPACT_ARTICLES = False
+ARTICLE_COLUMNS_SCHEMA = "columns/2"
+ARTICLE_COLUMNS_SCHEMAS = ("columns/1", ARTICLE_COLUMNS_SCHEMA)  # aceitos na leitura
+
+# Colunas com dicionário (valores repetidos viram índices)
+ARTICLE_DICT_COLUMNS = ("journalTitle", "source")
+# Colunas que, iguais à URL do DOI, são gravadas como 0 e reconstruídas
+ARTICLE_DOI_URL_COLUMNS = ("link", "doiLink")
+
+
+def encode_article_columns(articles: list) -> dict:
+    """
+    Converte uma lista de artigos em colunas paralelas:
+    {"schema", "length", "columns": {campo: [...]}, "dicts": {campo: [...]},
+     "missing": {campo: [linhas]}, "verbatim": {"cited_by": [linhas]}}.
+
+    'cited_by' {"value": n} guarda só n (outros formatos, inclusive null,
+    ficam em 'verbatim'); 'journalTitle'/'source' usam dicionário;
+    'link'/'doiLink' iguais a https://doi.org/<doi> viram 0. Null nas
+    colunas é null explícito; campos ausentes ficam listados em 'missing'.
+    """
+    fields = list(dict.fromkeys(field for art in articles for field in art))
+    columns, dicts, missing, verbatim = {}, {}, {}, {}
+
+    for field in fields:
+        values = [art.get(field) for art in articles]
+        absent = [i for i, art in enumerate(articles) if field not in art]
+        if absent:
+            missing[field] = absent
+
+        if field == "cited_by":
+            raw = [i for i, v in enumerate(values) if not (isinstance(v, dict) and set(v) == {"value"})]
+            if raw:
+                verbatim[field] = raw
+            values = [v["value"] if isinstance(v, dict) and set(v) == {"value"} else v for v in values]
+        elif field in ARTICLE_DOI_URL_COLUMNS:
+            values = [
+                0 if v and art.get("doi") and v == f"https://doi.org/{art['doi']}" else v
+                for v, art in zip(values, articles)
+            ]
+        elif field in ARTICLE_DICT_COLUMNS:
+            index = {}
+            values = [None if v is None else index.setdefault(v, len(index)) for v in values]
+            dicts[field] = list(index)
+
+        columns[field] = values
+
+    block = {"schema": ARTICLE_COLUMNS_SCHEMA, "length": len(articles), "columns": columns, "dicts": dicts}
+    if missing:
+        block["missing"] = missing
+    if verbatim:
+        block["verbatim"] = verbatim
+    return block
+
+
+def decode_article_columns(block) -> list:
+    """Inverso de encode_article_columns (listas comuns passam direto)."""
+    if not isinstance(block, dict) or block.get("schema") not in ARTICLE_COLUMNS_SCHEMAS:
+        return block
+
+    columns, dicts = block.get("columns") or {}, block.get("dicts") or {}
+    legacy = block.get("schema") != ARTICLE_COLUMNS_SCHEMA  # columns/1: null = ausente
+    articles = [{} for _ in range(block.get("length", 0))]
+
+    for field, values in columns.items():
+        lookup = dicts.get(field)
+        absent = set((block.get("missing") or {}).get(field) or [])
+        raw = set((block.get("verbatim") or {}).get(field) or [])
+        for i, (art, value) in enumerate(zip(articles, values)):
+            if i in absent or (legacy and value is None):
+                continue
+            if lookup is not None and value is not None:
+                value = lookup[value]
+            elif field == "cited_by" and i not in raw:
+                value = {"value": value}
+            art[field] = value
+
+    for art in articles:
+        for field in ARTICLE_DOI_URL_COLUMNS:
+            if art.get(field) == 0:
+                art[field] = f"https://doi.org/{art.get('doi')}"
+    return articles
+
+
+def _map_article_lists(data: dict, func) -> dict:
+    """Cópia rasa do documento com 'func' aplicada a cada lista de artigos."""
+    academic = dict(data.get("academicData") or {})
+    for key, source in academic.items():
+        if key == "publications":
+            academic[key] = func(source)
+        elif isinstance(source, dict) and "articles" in source:
+            academic[key] = {**source, "articles": func(source["articles"])}
+    return {**data, "academicData": academic}
+
+
+def compact_document(data: dict) -> dict:
+    """Documento com todas as listas de artigos em formato colunar."""
+    compact = _map_article_lists(
+        data, lambda arts: encode_article_columns(arts) if isinstance(arts, list) else arts
+    )
+    compact["articleEncoding"] = ARTICLE_COLUMNS_SCHEMA
+
+    # Só publica o formato colunar se ele volta exatamente ao documento
+    if expand_document(compact) != data:
+        logging.warning("    [Colunar] A codificação não preserva o documento. Gravando no formato comum.")
+        return data
+    return compact
+
+
+def expand_document(data):
+    """Documento com as listas de artigos de volta ao formato de objetos."""
+    if not isinstance(data, dict) or "articleEncoding" not in data:
+        return data
+    expanded = _map_article_lists(data, decode_article_columns)
+    expanded.pop("articleEncoding", None)
+    return expanded
+
+
+# ==============================================================================
+# ORQUESTRADOR DE COLETA (EXECUÇÃO PARALELA COM DEPENDÊNCIAS)
+# ==============================================================================
+COLLECTOR_MAX_WORKERS = 5
+COLLECTOR_TOTAL_BUDGET = 600  # segundos para a coleta inteira (keys.json: 'collector_total_budget')
+
+# Limite individual (segundos) de cada coletor
+COLLECTOR_TIMEOUTS = {
+    "github": 60,
+    "scholar": 300,
+    "scopus": 300,
+    "wos": 120,
+    "orcid": 90,
+}
+# ('collector_timeouts' no keys.json atualiza este dict em configure())
+
+
+# Tarefas abandonadas por timeout que ainda não terminaram: {nome: future}
+_abandoned_collectors = {}
+
+
+def _run_cancellable(cancel_event, func, *args):
+    """Executa 'func' com o Event de cancelamento da tarefa no contexto."""
+    token = _collector_cancel.set(cancel_event)
+    try:
+        return func(*args)
+    finally:
+        _collector_cancel.reset(token)
+
+
+def run_collectors(tasks, max_workers=COLLECTOR_MAX_WORKERS, total_budget=None):
+    """
+    Executa as tarefas de coleta em paralelo respeitando dependências.
+
+    'tasks' é um dict {nome: spec}, onde spec contém:
+      - "func":    callable que recebe um dict {dependência: resultado}
+      - "deps":    lista de nomes de tarefas que precisam terminar antes
+      - "timeout": limite em segundos para esta tarefa (opcional)
+      - "default": valor usado se a tarefa falhar ou estourar o tempo
+
+    Tarefas sem dependências pendentes são disparadas imediatamente.
+    Uma tarefa que estoura seu timeout (ou o orçamento total) recebe o
+    'default' e não bloqueia as demais. Ela também é cancelada: http_get()
+    e os laços de paginação levantam CollectorCancelled, então a thread
+    termina sem gastar mais quota. Enquanto a thread abandonada não
+    termina, a mesma tarefa não é disparada de novo (recebe o 'default').
+    Retorna {nome: resultado}.
+    """
+    for name, spec in tasks.items():
+        for dep in spec.get("deps", []):
+            if dep not in tasks:
+                raise ValueError(f"Tarefa '{name}' depende de '{dep}', que não existe.")
+
+    if total_budget is None:
+        total_budget = COLLECTOR_TOTAL_BUDGET
+    _load_heavy_modules()
+
+    results = {}
+    pending = dict(tasks)
+    running = {}  # future -> (nome, deadline, Event de cancelamento)
+    deadline_total = time.monotonic() + total_budget
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="coleta")
+
+    def _finish(name, value, status):
+        results[name] = value
+        if status != "ok":
+            logging.warning(f"    [Orquestrador] '{name}' finalizada com status '{status}'. Usando valor padrão.")
+
+    try:
+        while pending or running:
+            # 1. Dispara tudo que já tem as dependências resolvidas
+            if time.monotonic() >= deadline_total:
+                for name, spec in pending.items():
+                    _finish(name, spec.get("default"), "orçamento esgotado")
+                pending.clear()
+
+            for name in list(pending):
+                spec = pending[name]
+                deps = spec.get("deps", [])
+                if all(d in results for d in deps):
+                    del pending[name]
+                    previous = _abandoned_collectors.get(name)
+                    if previous is not None and not previous.done():
+                        _finish(name, spec.get("default"), "execução anterior ainda ativa")
+                        continue
+                    dep_values = {d: results[d] for d in deps}
+                    timeout = spec.get("timeout")
+                    task_deadline = time.monotonic() + timeout if timeout else deadline_total
+                    cancel_event = threading.Event()
+                    future = executor.submit(_run_cancellable, cancel_event, spec["func"], dep_values)
+                    running[future] = (name, min(task_deadline, deadline_total), cancel_event)
+
+            if not running:
+                # Dependências circulares: nada roda e nada fica pronto
+                for name, spec in pending.items():
+                    _finish(name, spec.get("default"), "dependência não resolvida")
+                break
+
+            # 2. Espera a próxima conclusão (ou o prazo mais próximo)
+            now = time.monotonic()
+            next_deadline = min(d for _, d, _ in running.values())
+            done, _ = wait(
+                list(running),
+                timeout=max(0, next_deadline - now),
+                return_when=FIRST_COMPLETED
+            )
+
+            for future in done:
+                name, _, _ = running.pop(future)
+                try:
+                    _finish(name, future.result(), "ok")
+                except Exception as e:
+                    logging.error(f"    [Orquestrador] Erro em '{name}': {e}")
+                    _finish(name, tasks[name].get("default"), "erro")
+
+            # 3. Expira as tarefas que passaram do prazo
+            now = time.monotonic()
+            for future, (name, task_deadline, cancel_event) in list(running.items()):
+                if now >= task_deadline:
+                    running.pop(future)
+                    cancel_event.set()
+                    if not future.cancel():
+                        _abandoned_collectors[name] = future
+                    _finish(name, tasks[name].get("default"), "timeout")
+
+    finally:
+        # Interrupção (ex.: Ctrl+C): nada que ainda roda deve continuar
+        for _, _, cancel_event in running.values():
+            cancel_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
+
+# ==============================================================================
+# TAREFAS DE COLETA (USADAS PELA EXECUÇÃO COMPLETA E PELOS SUBCOMANDOS)
+# ==============================================================================
+def _task_old_data(_deps):
+    logging.info(">>> Carregando dados anteriores...")
+    data = expand_document(load_json_data(MAIN_FILENAME))
+    old_scopus = ((data or {}).get("academicData") or {}).get("scopus")
+    if old_scopus:
+        logging.info(f"    [Cache] Scopus antigo encontrado ({len(old_scopus.get('articles', []))} artigos).")
     else:
         logging.info("    [Cache] Nenhum dado Scopus anterior.")
+    return data
 
-    # 2. Coleta de Dados
-    logging.info("\n>>> 2. Iniciando Coleta de Dados das APIs...")
-    
-    # GITHUB
+
+def _task_github(_deps):
     logging.info("    > GitHub...")
-    github_repos = fetch_github_repos(GITHUB_USERNAME)
+    return fetch_github_repos(GITHUB_USERNAME)
+
 
-    # SCHOLAR
+def _task_scholar(deps):
     logging.info("    > Google Scholar...")
-    scholar_data = None
-    for api_key in SERPAPI_KEYS:
-        scholar_data = fetch_scholar_data(SCHOLAR_AUTHOR_ID, api_key)
-        if scholar_data: 
-            logging.info("      [Scholar] Coleta realizada com sucesso.")
-            break
-    if not scholar_data: logging.warning("      [Scholar] Falha em todas as chaves.")
+    old_scholar = ((deps["old_data"] or {}).get("academicData") or {}).get("google_scholar")
+    key_pool = SerpApiKeyPool(SERPAPI_KEYS)
+    data = fetch_scholar_data(
+        SCHOLAR_AUTHOR_ID, key_pool,
+        previous_data=old_scholar, incremental=SCHOLAR_INCREMENTAL
+    )
+    if data:
+        logging.info(f"      [Scholar] Coleta realizada com sucesso. Quota restante: {key_pool.summary()}")
+        return data
+    logging.warning("      [Scholar] Falha em todas as chaves.")
+    return None
 
-    # SCOPUS (Agora passamos o old_scopus_data)
+
+def _task_scopus(deps):
     logging.info("    > Scopus...")
-    scopus_data = None
-    if SCOPUS_API_KEY and SCOPUS_AUTHOR_ID:
-        scopus_data = fetch_scopus_data(SCOPUS_AUTHOR_ID, SCOPUS_API_KEY, previous_data=old_scopus_data)
-    else:
+    if not (SCOPUS_API_KEY and SCOPUS_AUTHOR_ID):
         logging.warning("      [Scopus] Chaves não configuradas.")
+        return None
+    old_scopus = ((deps["old_data"] or {}).get("academicData") or {}).get("scopus")
+    return fetch_scopus_data(SCOPUS_AUTHOR_ID, SCOPUS_API_KEY, previous_data=old_scopus)
+
 
-    # WEB OF SCIENCE
+def _task_wos(_deps):
     logging.info("    > Web of Science...")
-    wos_data = fetch_wos_data(WOS_RESEARCHER_ID, WOS_API_KEY) if WOS_RESEARCHER_ID else None
-    
-    # ORCID
+    return fetch_wos_data(WOS_RESEARCHER_ID, WOS_API_KEY) if WOS_RESEARCHER_ID else None
+
+
+def _task_orcid(_deps):
     logging.info("    > ORCID...")
-    orcid_raw = fetch_orcid_works(ORCID_ID) if ORCID_ID else []
-    if isinstance(orcid_raw, dict):
-         orcid_list = orcid_raw.get("articles", [])
-    else:
-         orcid_list = orcid_raw
+    orcid_raw = fetch_orcid_works(ORCID_ID, detailed=ORCID_DETAILED) if ORCID_ID else []
+    orcid_list = orcid_raw.get("articles", []) if isinstance(orcid_raw, dict) else orcid_raw
     logging.info(f"      [ORCID] {len(orcid_list)} itens recuperados.")
+    return orcid_list
+
+
+def build_collector_tasks() -> dict:
+    """
+    Tarefas de coleta para run_collectors(). As fontes independentes rodam
+    em paralelo; o Scopus e o Scholar esperam os dados antigos (fallback de
+    IP e modo incremental) e o diff só roda após todas terminarem.
+    """
+    return {
+        "old_data": {"func": _task_old_data, "default": None},
+        "github":   {"func": _task_github, "timeout": COLLECTOR_TIMEOUTS["github"], "default": []},
+        "scholar":  {"func": _task_scholar, "deps": ["old_data"], "timeout": COLLECTOR_TIMEOUTS["scholar"], "default": None},
+        "scopus":   {"func": _task_scopus, "deps": ["old_data"], "timeout": COLLECTOR_TIMEOUTS["scopus"], "default": None},
+        "wos":      {"func": _task_wos, "timeout": COLLECTOR_TIMEOUTS["wos"], "default": None},
+        "orcid":    {"func": _task_orcid, "timeout": COLLECTOR_TIMEOUTS["orcid"], "default": []},
+    }
+
 
-    # 3. Montagem do JSON Final
+# ==============================================================================
+# EXECUÇÃO PRINCIPAL (ATUALIZADA)
+# ==============================================================================
+def assemble_document(results: dict, old_data=None) -> dict:
+    """
+    Monta o documento final a partir dos resultados de cada fonte
+    ({"github", "scholar", "scopus", "wos", "orcid"}).
+    """
     logging.info("\n>>> 3. Montando estrutura do JSON Final...")
 
-    new_data = {
-        "githubRepos": github_repos,
+    old_acad = (old_data or {}).get("academicData") or {}
+
+    # Coletor configurado que falhou (None / lista vazia = valor padrão do
+    # orquestrador) mantém a seção publicada: só uma coleta bem-sucedida
+    # pode gerar remoções no diff.
+    def carry_forward(value, configured, old_value, label):
+        if value or not configured or not old_value:
+            return value
+        logging.warning(f"    [{label}] Coleta sem dados. Mantendo a versão anterior.")
+        return old_value
+
+    github_repos = carry_forward(
+        results.get("github"), GITHUB_USERNAME, (old_data or {}).get("githubRepos"), "GitHub")
+    scholar_data = carry_forward(
+        results.get("scholar"), SCHOLAR_AUTHOR_ID, old_acad.get("google_scholar"), "Scholar")
+    scopus_data = carry_forward(
+        results.get("scopus"), SCOPUS_API_KEY and SCOPUS_AUTHOR_ID, old_acad.get("scopus"), "Scopus")
+    wos_data = carry_forward(
+        results.get("wos"), WOS_RESEARCHER_ID, old_acad.get("web_of_science"), "WoS")
+    orcid_articles = carry_forward(
+        results.get("orcid"), ORCID_ID, (old_acad.get("orcid") or {}).get("articles"), "ORCID")
+
+    return {
+        "githubRepos": github_repos or [],
         "lastUpdated": datetime.now().strftime("%d/%m/%Y %H:%M"),
         "academicData": {
             "google_scholar": scholar_data,
@@ -1248,17 +3916,39 @@ if __name__ == "__main__":
             "web_of_science": wos_data,
             "orcid": {
                 "source_name": "ORCID",
-                "articles": orcid_list
+                "articles": orcid_articles or []
             }
         }
     }
 
+
+def publish_document(old_data, new_data) -> bool:
+    """
+    Merge entre fontes, diff, histórico e gravação dos arquivos (JSON
+    completo, delta e shards). Retorna True se o arquivo foi atualizado.
+    """
+    try:
+        registry = ArticleRegistry(REGISTRY_DB_FILE)
+    except sqlite3.Error as e:
+        logging.warning(f"    [Registro] Não foi possível abrir '{REGISTRY_DB_FILE}': {e}. Seguindo sem IDs estáveis.")
+        registry = None
+
+    # Lista canônica: uma entrada por publicação, com citações por fonte
+    new_data["academicData"]["publications"] = merge_publications(new_data["academicData"], registry)
+
     # 4. Análise de Mudanças
     logging.info("\n>>> 4. Analisando diferenças (Diff)...")
     
-    report_lines, _ = analyze_changes(old_data, new_data)
+    report_lines, delta = analyze_changes(old_data, new_data, registry)
+    if registry is not None:
+        try:
+            CitationHistory(registry).record_run(new_data["academicData"])
+        except sqlite3.Error as e:
+            logging.warning(f"    [Histórico] Falha ao gravar a execução: {e}")
+        registry.close()
 
-    if report_lines:
+    updated = False
+    if delta_has_changes(delta):
         print("\n" + "=" * 60)
         print(" RELATÓRIO DE MUDANÇAS DETECTADAS")
         print("=" * 60)
@@ -1267,8 +3957,16 @@ if __name__ == "__main__":
         
         logging.info(">>> Mudanças válidas. Salvando arquivo...")
         
-        if generate_fallback_file(new_data, TEMP_FILENAME):
-            _ = update_main_file(MAIN_FILENAME, TEMP_FILENAME)
+        # Modo compacto: listas de artigos em colunas (decodificadas no utils.js)
+        output_data = compact_document(new_data) if COMPACT_ARTICLES else new_data
+
+        if generate_fallback_file(output_data, TEMP_FILENAME):
+            if update_main_file(MAIN_FILENAME, TEMP_FILENAME):
+                updated = True
+                # Delta compacto ao lado do arquivo completo (consumidores incrementais)
+                if save_json_data(DELTA_FILENAME, delta):
+                    logging.info(f"✓ Delta da execução salvo em '{DELTA_FILENAME}'.")
+                write_data_bundles(output_data)
             logging.info(">>> PROCESSO CONCLUÍDO COM SUCESSO: Arquivo atualizado.")
             
     else:
@@ -1280,4 +3978,220 @@ if __name__ == "__main__":
                 os.remove(TEMP_FILENAME)
             except: pass
 
+    return updated
+
+
+def run_update():
+    """Execução completa: coleta, merge, diff, histórico e gravação dos arquivos."""
+    logging.info("\n" + "="*60)
+    logging.info(" INICIANDO SCRIPT DE ATUALIZAÇÃO ACADÊMICA")
+    logging.info("="*60)
+
+    # 1-2. Coleta de Dados (tarefas em build_collector_tasks)
+    logging.info("\n>>> 1-2. Iniciando Coleta de Dados das APIs (em paralelo)...")
+    started = time.monotonic()
+    results = run_collectors(build_collector_tasks())
+    logging.info(f"    Coleta concluída em {time.monotonic() - started:.1f}s.")
+
+    # 3-4. Montagem, diff e gravação
+    old_data = results["old_data"]
+    publish_document(old_data, assemble_document(results, old_data))
+
     logging.info("="*60 + "\n")
+
+
+# ==============================================================================
+# MODO DAEMON (AGENDAMENTO POR FONTE)
+# ==============================================================================
+# Intervalo (segundos) entre coletas de cada fonte (keys.json: 'daemon_intervals')
+DAEMON_INTERVALS = {
+    "github": 3600,
+    "scholar": 86400,
+    "scopus": 86400,
+    "wos": 7 * 86400,
+    "orcid": 86400,
+}
+DAEMON_JITTER = 0.1          # ±10% em cada intervalo (evita rajadas sincronizadas)
+DAEMON_RETRY_DELAY = 900     # nova tentativa após uma coleta que falhou
+
+
+def _snapshot_path(source: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"{source}.json")
+
+
+def _content_hash(data) -> str:
+    """Hash estável do conteúdo (JSON canônico) de uma coleta."""
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_source_snapshot(source: str):
+    """Último snapshot salvo de uma fonte: {"fetched_at", "hash", "data"} ou None."""
+    snapshot = load_json_data(_snapshot_path(source), quiet=True)
+    return snapshot if isinstance(snapshot, dict) and "data" in snapshot else None
+
+
+def save_source_snapshot(source: str, data) -> dict:
+    snapshot = {"fetched_at": time.time(), "hash": _content_hash(data), "data": data}
+    save_json_data(_snapshot_path(source), snapshot)
+    return snapshot
+
+
+def _daemon_next_run(source: str) -> float:
+    interval = DAEMON_INTERVALS[source]
+    return time.time() + interval * random.uniform(1 - DAEMON_JITTER, 1 + DAEMON_JITTER)
+
+
+def run_daemon(stop_event=None, once=False):
+    """
+    Mantém o processo (e os pools de conexão) vivo e coleta cada fonte no
+    seu próprio intervalo, com jitter. Cada coleta bem-sucedida vira um
+    snapshot em '<cache>/snapshots/'; quando o conteúdo de alguma fonte
+    muda, o documento é remontado a partir dos snapshots mais recentes de
+    todas as fontes e publicado. Coletas que falham mantêm o snapshot
+    anterior e são repetidas após DAEMON_RETRY_DELAY.
+
+    Com 'once', executa apenas as coletas vencidas e retorna.
+    """
+    stop_event = stop_event or threading.Event()
+    sources = list(DAEMON_INTERVALS)
+    tasks = build_collector_tasks()
+
+    old_data = _task_old_data({})
+    snapshots = {source: load_source_snapshot(source) for source in sources}
+    next_due = {
+        source: (snapshots[source]["fetched_at"] + DAEMON_INTERVALS[source]) if snapshots[source] else 0
+        for source in sources
+    }
+    logging.info(
+        "Daemon iniciado. Intervalos: "
+        + ", ".join(f"{s}={DAEMON_INTERVALS[s]}s" for s in sources)
+    )
+
+    while not stop_event.is_set():
+        now = time.time()
+        due = [source for source in sources if next_due[source] <= now]
+
+        if due:
+            logging.info(f"\n>>> [Daemon] Coletando: {', '.join(due)}")
+            cycle_tasks = {"old_data": {"func": lambda _deps: old_data, "default": old_data}}
+            cycle_tasks.update({source: tasks[source] for source in due})
+            results = run_collectors(cycle_tasks)
+
+            changed = []
+            for source in due:
+                value = results.get(source)
+                if not value:
+                    logging.warning(f"    [Daemon] {source}: coleta sem dados; nova tentativa em {DAEMON_RETRY_DELAY}s.")
+                    next_due[source] = time.time() + min(DAEMON_RETRY_DELAY, DAEMON_INTERVALS[source])
+                    continue
+                if not snapshots[source] or snapshots[source]["hash"] != _content_hash(value):
+                    snapshots[source] = save_source_snapshot(source, value)
+                    changed.append(source)
+                next_due[source] = _daemon_next_run(source)
+
+            if changed:
+                logging.info(f"    [Daemon] Fontes alteradas: {', '.join(changed)}. Remontando o documento...")
+                latest = {source: (snapshots[source] or {}).get("data") for source in sources}
+                new_data = assemble_document(latest, old_data)
+                if publish_document(old_data, new_data):
+                    old_data = new_data
+            else:
+                logging.info("    [Daemon] Nenhuma fonte mudou desde o último snapshot.")
+
+        if once:
+            break
+
+        wait_for = max(1.0, min(next_due.values()) - time.time())
+        logging.info(f"    [Daemon] Próxima coleta em {wait_for / 60:.0f} min.")
+        stop_event.wait(wait_for)
+
+    logging.info("Daemon encerrado.")
+
+
+# ==============================================================================
+# INTERFACE DE LINHA DE COMANDO
+# ==============================================================================
+# Subcomandos por fonte: (tarefa de coleta, fontes exigidas em validate_config)
+CLI_SOURCES = {
+    "github": (_task_github, ("github",)),
+    "scholar": (_task_scholar, ("scholar",)),
+    "scopus": (_task_scopus, ("scopus",)),
+    "wos": (_task_wos, ("wos",)),
+    "orcid": (_task_orcid, ("orcid",)),
+}
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="update_fallback.py",
+        description="Atualiza o fallback-data.json do site (GitHub, Scholar, Scopus, WoS e ORCID)."
+    )
+    parser.add_argument("--keys", default="keys.json", help="arquivo de configurações (padrão: keys.json)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log em nível DEBUG")
+    parser.add_argument("--offline", action="store_true", help="responde só do cache HTTP em disco (sem rede)")
+    parser.add_argument("--no-cache", action="store_true", help="ignora o cache HTTP em disco")
+
+    sub = parser.add_subparsers(dest="command", metavar="COMANDO")
+    sub.add_parser("run", help="execução completa (padrão sem subcomando)")
+    daemon_parser = sub.add_parser("daemon", help="processo contínuo com intervalos por fonte")
+    daemon_parser.add_argument("--once", action="store_true", help="executa só as coletas vencidas e sai")
+    for name in CLI_SOURCES:
+        source_parser = sub.add_parser(name, help=f"coleta apenas {name} e imprime o JSON")
+        source_parser.add_argument("-o", "--output", help="grava o JSON neste arquivo em vez de imprimir")
+    return parser
+
+
+def main(argv=None) -> int:
+    """Ponto de entrada da CLI. Retorna o código de saída."""
+    args = build_arg_parser().parse_args(argv)
+    setup_logging(logging.DEBUG if args.verbose else logging.INFO)
+
+    try:
+        configure(args.keys)
+    except (OSError, json.JSONDecodeError):
+        return 1
+
+    global HTTP_OFFLINE, HTTP_CACHE_ENABLED
+    if args.offline:
+        HTTP_OFFLINE = True
+        logging.info("Modo offline: somente respostas do cache HTTP em disco.")
+    if args.no_cache:
+        HTTP_CACHE_ENABLED = False
+
+    command = args.command or "run"
+    if command == "run":
+        if not validate_config():
+            return 1
+        run_update()
+        return 0
+
+    if command == "daemon":
+        if not validate_config():
+            return 1
+        stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+        try:
+            run_daemon(stop_event, once=args.once)
+        except KeyboardInterrupt:
+            logging.info("Daemon interrompido pelo usuário.")
+        return 0
+
+    task, required = CLI_SOURCES[command]
+    if not validate_config(required):
+        return 1
+    _load_heavy_modules()
+    deps = {"old_data": _task_old_data({})}
+    result = task(deps)
+
+    if args.output:
+        if not save_json_data(args.output, result):
+            return 1
+    else:
+        json.dump(result, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+    return 0 if result is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -579,11 +579,12 @@ const scholarScript = (function() {
                     if (!row) return { all: 0, recent: null };
                     const key = Object.keys(row)[0]; const obj = row[key];
                     const recentKey = Object.keys(obj).find(k => k.startsWith('since_') || k.startsWith('desde_'));
-                    return { all: (obj.all != null) ? obj.all : 0, recent: (recentKey && obj[recentKey] != null) ? obj[recentKey] : null };
+                    return { all: (obj.all != null) ? obj.all : 0, recent: (recentKey && obj[recentKey] != null) ? obj[recentKey] : null, since: recentKey ? recentKey.replace(/\D/g, '') : null };
                 };
                 if(citedBy.table[0]) result.metrics.cit = getVals(citedBy.table[0]);
                 if(citedBy.table[1]) result.metrics.h = getVals(citedBy.table[1]);
                 if(citedBy.table[2]) result.metrics.i10 = getVals(citedBy.table[2]);
+                result.metrics.sinceYear = result.metrics.cit.since || '2021';
             } else if (Array.isArray(data.articles)) result.metrics.cit.all = data.articles.length;
 
             if (totalPubs != null) result.metrics.pubs = totalPubs;
@@ -626,7 +627,7 @@ const scholarScript = (function() {
 
     function updatePeriodLabels(prefix, metrics) {
         const t = window.translations?.[window.currentLang] || {};
-        const sinceText = (t['metric-since'] || 'Since 2021').replace(/\d{4}/, '2021');
+        const sinceText = (t['metric-since'] || 'Since 2021').replace(/\d{4}/, metrics.sinceYear || '2021');
 
         ['cit', 'h', 'i10'].forEach(key => {
             const valObj = metrics[key];
@@ -950,7 +951,8 @@ const scholarScript = (function() {
         const fb = window.fallbackData;
         if (fb) {
             const acad = fb.academicData || fb;
-            let raw = acad.maximized?.articles || acad.google_scholar?.articles || [];
+            // 'publications' já vem unificada entre as fontes pelo update_fallback.py
+            let raw = acad.publications || acad.maximized?.articles || acad.google_scholar?.articles || [];
             allArticles = raw.map(normalizeArticle).sort((a,b) => b.cited_by.value - a.cited_by.value);
         }
 
@@ -1694,7 +1696,7 @@ const LanguageManager = {
 
     /**
      * Ponto de entrada do módulo.
-     * Carrega translations.json e fallback-data.json, depois inicializa o resto.
+     * Carrega translations.json e os dados (shards ou fallback-data.json), depois inicializa o resto.
      */
     init() {
         console.log("LanguageManager.init: Iniciando carregamento de JSONs...");
@@ -1708,10 +1710,7 @@ const LanguageManager = {
                 if (!response.ok) throw new Error(`HTTP error! status: ${response.status} ao buscar translations.json`);
                 return response.json();
             }),
-            fetch('fallback-data.json').then(response => {
-                if (!response.ok) throw new Error(`HTTP error! status: ${response.status} ao buscar fallback-data.json`);
-                return response.json();
-            })
+            this.loadFallbackData()
         ])
         .then(([translationsData, fallbackData]) => {
             console.log("LanguageManager.init: JSONs carregados com sucesso.");
@@ -1732,6 +1731,107 @@ const LanguageManager = {
         // --- FIM ALTERAÇÃO ---
     },
     
+    /**
+     * Shards de dados usados por página (id do <body>). Os shards são gerados
+     * pelo update_fallback.py em data/ e listados em data/manifest.json.
+     */
+    pageDataShards: {
+        'index-page': ['repos', 'metrics', 'publications'],
+        'page-projects': ['repos'],
+        'page-publications': ['metrics', 'publications'],
+        'page-privacy': []
+    },
+
+    /**
+     * Junta um shard (documento parcial) no documento completo.
+     * Objetos são mesclados recursivamente; listas e valores são substituídos.
+     */
+    _mergeDataShard(target, shard) {
+        Object.entries(shard || {}).forEach(([key, value]) => {
+            if (value && typeof value === 'object' && !Array.isArray(value)) {
+                if (!target[key] || typeof target[key] !== 'object') target[key] = {};
+                this._mergeDataShard(target[key], value);
+            } else {
+                target[key] = value;
+            }
+        });
+        return target;
+    },
+
+    /**
+     * Decodifica uma lista de artigos no formato colunar ('columns/2', ou o
+     * antigo 'columns/1') gerado pelo update_fallback.py no modo compacto.
+     * Null nas colunas é null explícito; campos ausentes vêm em 'missing'.
+     * Listas comuns passam direto.
+     */
+    _decodeArticleColumns(block) {
+        if (!block || Array.isArray(block) || !['columns/1', 'columns/2'].includes(block.schema)) return block;
+        const columns = block.columns || {}, dicts = block.dicts || {};
+        const missing = block.missing || {}, verbatim = block.verbatim || {};
+        const legacy = block.schema === 'columns/1';
+        const articles = Array.from({ length: block.length || 0 }, () => ({}));
+
+        Object.entries(columns).forEach(([field, values]) => {
+            const lookup = dicts[field];
+            const absent = new Set(missing[field] || []), raw = new Set(verbatim[field] || []);
+            values.forEach((value, i) => {
+                if (absent.has(i) || (legacy && (value === null || value === undefined))) return;
+                if (lookup && value !== null) value = lookup[value];
+                else if (field === 'cited_by' && !raw.has(i)) value = { value };
+                articles[i][field] = value;
+            });
+        });
+        articles.forEach(art => ['link', 'doiLink'].forEach(field => {
+            if (art[field] === 0) art[field] = `https://doi.org/${art.doi}`;
+        }));
+        return articles;
+    },
+
+    /** Aplica _decodeArticleColumns a todas as listas de artigos do documento. */
+    _expandArticleLists(data) {
+        const acad = data?.academicData;
+        if (!acad) return data;
+        Object.entries(acad).forEach(([key, source]) => {
+            if (key === 'publications') acad[key] = this._decodeArticleColumns(source);
+            else if (source && source.articles) source.articles = this._decodeArticleColumns(source.articles);
+        });
+        return data;
+    },
+
+    /**
+     * Carrega apenas os shards que a página renderiza. Sem manifest (ou se
+     * algum shard falhar), usa o fallback-data.json completo.
+     */
+    async loadFallbackData() {
+        const fetchJson = (url, options) => fetch(url, options).then(response => {
+            if (!response.ok) throw new Error(`HTTP error! status: ${response.status} ao buscar ${url}`);
+            return response.json();
+        });
+
+        const wanted = this.pageDataShards[document.body.id];
+        if (wanted) {
+            try {
+                const manifest = await fetchJson('data/manifest.json', { cache: 'no-cache' });
+                const shards = manifest.shards || {};
+                const load = (names) => Promise.all(
+                    names.filter(name => shards[name]).map(name => fetchJson(`data/${shards[name].file}`))
+                );
+
+                const data = {};
+                (await load(wanted)).forEach(shard => this._mergeDataShard(data, shard));
+
+                // Dados antigos sem lista unificada: usa os artigos do Scholar
+                if (wanted.includes('publications') && !data.academicData?.publications?.length) {
+                    (await load(['articles.google_scholar'])).forEach(shard => this._mergeDataShard(data, shard));
+                }
+                return this._expandArticleLists(data);
+            } catch (error) {
+                console.warn("LanguageManager: shards indisponíveis, usando fallback-data.json.", error);
+            }
+        }
+        return fetchJson('fallback-data.json').then(data => this._expandArticleLists(data));
+    },
+
     subtitleState: {
         timeout: null,
         index: 0,